@@ -21,6 +21,7 @@ __version__  = "2018.05"
     [ ] Backward Algorithm
     [ ] Forward-Backward Algorithm
     [ ] Viterbi Algorithm , Recover Sequence
+    [Y] N-state matrix-form Forward-Backward & Viterbi , batched - COMPLETE , See HMM_matrix.py
     
 [ ] Use Particle filter to recover sequence ( HMM_02_Intro.py )
 """
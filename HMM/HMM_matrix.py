@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ~~ Future First ~~
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
+
+"""
+HMM_matrix.py
+2026 October , Template Version: 2018-05-10
+General N-state Hidden Markov Model with matrix-form inference , generalizing HMM_01_Intro.py
+
+Dependencies: numpy
+"""
+__progname__ = "HMM Matrix Engine"
+__version__  = "2026.10"
+"""  
+~~~ Developmnent Plan ~~~
+[Y] Scaled Forward Algorithm , batched over sequences
+[Y] Scaled Backward Algorithm & Forward-Backward smoothing
+[Y] Viterbi Algorithm in log space , Recover Sequence
+[Y] Baum-Welch learning , E-step over sequence shards in a process pool
+[Y] Streaming filter and fixed-lag smoother over observation iterators
+"""
+
+# === Init Environment =====================================================================================================================
+# ~~~ Imports ~~~
+# ~~ Standard ~~
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool , cpu_count
+# ~~ Special ~~
+import numpy as np
+
+# ~~ Script Signature ~~
+def __prog_signature__(): return __progname__ + " , Version " + __version__ # Return a string representing program name and verions
+
+# ___ End Init _____________________________________________________________________________________________________________________________
+
+
+# === Main Application =====================================================================================================================
+
+# = Program Classes =
+
+class HMM( object ):
+    """ Hidden Markov Model with 'N' states and 'M' observation symbols , same conventions as HMM_01_Intro.py:
+        T[ j , i ] = P( x_{t+1} = j | x_t = i ) , each column sums to 1
+        Z[ o , i ] = P( z_t = o | x_t = i ) ,     each column sums to 1
+    Observation sequences are integer arrays , shape (L,) for one sequence or (B, L) for a batch of equal-length sequences """
+    
+    def __init__( self , T , Z , prior = None ):
+        """ Store the transition model 'T' , sensor model 'Z' , and initial distribution 'prior' ( uniform by default ) """
+        self.T = np.array( T , dtype = float )
+        self.Z = np.array( Z , dtype = float )
+        self.N = self.T.shape[0] # Number of hidden states
+        self.M = self.Z.shape[0] # Number of observation symbols
+        self.prior = np.full( self.N , 1.0 / self.N ) if prior is None else np.array( prior , dtype = float )
+        
+    @staticmethod
+    def _as_batch( obs ):
+        """ Return ( obs as a (B, L) int array , whether the input was a single sequence ) """
+        obs = np.asarray( obs , dtype = int )
+        if obs.ndim == 1:
+            return obs[ None , : ] , True
+        return obs , False
+    
+    def sample( self , length , batch = None , rng = None ):
+        """ Generate states and observations , each (length,) or (batch, length) """
+        rng = np.random.RandomState( rng ) if not isinstance( rng , np.random.RandomState ) else rng
+        B = 1 if batch is None else batch
+        cumT = np.cumsum( self.T , axis = 0 ) # Column-wise CDFs for inverse-transform sampling
+        cumZ = np.cumsum( self.Z , axis = 0 )
+        states = np.empty( ( B , length ) , dtype = int )
+        # Every draw is clamped as it is made , a CDF summing to 1 - epsilon could otherwise yield N and index past the end
+        states[ : , 0 ] = np.minimum( np.searchsorted( np.cumsum( self.prior ) , rng.rand( B ) ) , self.N - 1 )
+        for t in range( 1 , length ):
+            u = rng.rand( B )
+            states[ : , t ] = np.minimum( ( u[ : , None ] > cumT[ : , states[ : , t - 1 ] ].T ).sum( axis = 1 ) , self.N - 1 )
+        u = rng.rand( B , length )
+        observs = np.minimum( ( u[ ... , None ] > cumZ[ : , states ].transpose( 1 , 2 , 0 ) ).sum( axis = 2 ) , self.M - 1 )
+        if batch is None:
+            return states[0] , observs[0]
+        return states , observs
+    
+    def forward( self , obs ):
+        """ Scaled Forward Algorithm: return alpha , the filtered P( x_t | z_1..z_t ) with shape (L, N) or (B, L, N) ,
+        and the scale factors c_t = P( z_t | z_1..z_{t-1} ) with shape (L,) or (B, L) """
+        obs , single = self._as_batch( obs )
+        (B, L) = obs.shape
+        like  = self.Z[ obs ] # ------------ (B, L, N) , P( z_t | x_t = i )
+        alpha = np.empty( ( B , L , self.N ) )
+        c     = np.empty( ( B , L ) )
+        T_T   = self.T.T
+        a = np.broadcast_to( self.prior , ( B , self.N ) )
+        for t in range( L ):
+            if t:
+                a = a.dot( T_T ) # Predict: P( x_t | z_1..z_{t-1} ) = T P( x_{t-1} | z_1..z_{t-1} )
+            a = a * like[ : , t ] # Update with the sensor model
+            c[ : , t ] = a.sum( axis = 1 )
+            a = a / c[ : , t , None ] # Normalize , alpha stays a distribution so nothing underflows
+            alpha[ : , t ] = a
+        if single:
+            return alpha[0] , c[0]
+        return alpha , c
+    
+    def backward( self , obs , c ):
+        """ Scaled Backward Algorithm: return beta_t( i ) = P( z_{t+1}..z_L | x_t = i ) / prod( c_{t+1}..c_L ) ,
+        using the scale factors 'c' from 'forward' """
+        obs , single = self._as_batch( obs )
+        c = np.asarray( c ).reshape( obs.shape )
+        (B, L) = obs.shape
+        like = self.Z[ obs ]
+        beta = np.empty( ( B , L , self.N ) )
+        b = np.ones( ( B , self.N ) )
+        beta[ : , -1 ] = b
+        for t in range( L - 2 , -1 , -1 ):
+            # beta_t( i ) = \sum_j beta_{t+1}( j ) * P( z_{t+1} | x_{t+1} = j ) * P( x_{t+1} = j | x_t = i )
+            b = ( b * like[ : , t + 1 ] ).dot( self.T ) / c[ : , t + 1 , None ]
+            beta[ : , t ] = b
+        if single:
+            return beta[0]
+        return beta
+    
+    def posterior( self , obs ):
+        """ Forward-Backward: return the smoothed P( x_t | z_1..z_L ) , (L, N) or (B, L, N) """
+        alpha , c = self.forward( obs )
+        return alpha * self.backward( obs , c )
+    
+    def log_likelihood( self , obs ):
+        """ Return log P( z_1..z_L ) for each sequence """
+        return np.log( self.forward( obs )[1] ).sum( axis = -1 )
+    
+    def viterbi( self , obs ):
+        """ Return the most likely state sequence , (L,) or (B, L) , and its log probability """
+        obs , single = self._as_batch( obs )
+        (B, L) = obs.shape
+        with np.errstate( divide = 'ignore' ): # log( 0 ) = -inf is exactly what we want for impossible moves
+            logT  = np.log( self.T )
+            logZ  = np.log( self.Z )
+            delta = np.log( self.prior ) + logZ[ obs[ : , 0 ] ] # (B, N)
+        ptrType = np.uint8 if self.N <= 256 else np.int32 # Backpointers dominate memory for long sequences
+        back = np.empty( ( L , B , self.N ) , dtype = ptrType )
+        rows = np.arange( B )[ : , None ]
+        for t in range( 1 , L ):
+            scores = delta[ : , None , : ] + logT # (B, to, from)
+            back[ t ] = scores.argmax( axis = 2 )
+            delta = scores[ rows , np.arange( self.N ) , back[ t ] ] + logZ[ obs[ : , t ] ]
+        path = np.empty( ( B , L ) , dtype = int )
+        path[ : , -1 ] = delta.argmax( axis = 1 )
+        logProb = delta.max( axis = 1 )
+        for t in range( L - 1 , 0 , -1 ):
+            path[ : , t - 1 ] = back[ t ][ np.arange( B ) , path[ : , t ] ]
+        if single:
+            return path[0] , logProb[0]
+        return path , logProb
+
+# _ End Class _
+
+# = Streaming =
+
+def sample_stream( hmm , rng = None ):
+    """ Yield ( state , observation ) pairs from 'hmm' forever """
+    rng = np.random.RandomState( rng ) if not isinstance( rng , np.random.RandomState ) else rng
+    x = rng.choice( hmm.N , p = hmm.prior )
+    while True:
+        yield x , rng.choice( hmm.M , p = hmm.Z[ : , x ] )
+        x = rng.choice( hmm.N , p = hmm.T[ : , x ] )
+
+def online_filter( hmm , observations ):
+    """ Yield the filtered P( x_t | z_1..z_t ) for each observation drawn from the iterator 'observations'
+    O( N^2 ) per step and constant memory """
+    a = None
+    for o in observations:
+        a = hmm.prior * hmm.Z[ o ] if a is None else hmm.T.dot( a ) * hmm.Z[ o ]
+        a /= a.sum()
+        yield a
+
+def fixed_lag_smoother( hmm , observations , lag ):
+    """ Yield P( x_t | z_1..z_{t+lag} ) for each step t in order , each one 'lag' observations after z_t arrives
+    When 'observations' runs out , the last 'lag' steps are flushed , smoothed on whatever future there was
+    Keeps only the last lag + 1 filtered distributions: O( lag N^2 ) per step and O( lag N ) memory """
+    window = deque( maxlen = lag + 1 ) # ( filtered distribution , observation ) for steps t - lag .. t
+    
+    def smoothed( items ):
+        """ Smooth the first filtered distribution in 'items' against the observations after it """
+        b = np.ones( hmm.N )
+        for ( _ , o ) in reversed( items[ 1: ] ):
+            b = ( b * hmm.Z[ o ] ).dot( hmm.T ) # beta recursion , normalized only for range
+            b /= b.sum()
+        p = items[0][0] * b
+        return p / p.sum()
+    
+    observations = iter( observations )
+    for o in observations:
+        a = hmm.prior * hmm.Z[ o ] if not window else hmm.T.dot( window[-1][0] ) * hmm.Z[ o ]
+        window.append( ( a / a.sum() , o ) )
+        if len( window ) == lag + 1:
+            yield smoothed( list( window ) )
+    items = list( window )
+    for i in range( 1 if len( items ) == lag + 1 else 0 , len( items ) ): # Flush what has not been yielded
+        yield smoothed( items[ i: ] )
+
+# = Learning =
+
+def expected_counts( hmm , seqs ):
+    """ E-step for a list of observation sequences ( any lengths ): return the expected initial-state counts (N,) ,
+    transition counts (N, N) as in 'T' , emission counts (M, N) as in 'Z' , and the total log likelihood """
+    priorCount = np.zeros( hmm.N )
+    transCount = np.zeros( ( hmm.N , hmm.N ) )
+    emitCount  = np.zeros( ( hmm.M , hmm.N ) )
+    logLike    = 0.0
+    byLength = {} # Sequences of equal length are processed together as one batch
+    for seq in seqs:
+        byLength.setdefault( len( seq ) , [] ).append( seq )
+    for group in byLength.values():
+        obs   = np.array( group , dtype = int ) # (B, L)
+        alpha , c = hmm.forward( obs )
+        beta  = hmm.backward( obs , c )
+        gamma = alpha * beta # (B, L, N) , P( x_t | all z )
+        priorCount += gamma[ : , 0 ].sum( axis = 0 )
+        # xi_t( j , i ) = alpha_t( i ) T[ j , i ] P( z_{t+1} | j ) beta_{t+1}( j ) / c_{t+1} , summed over b and t
+        ahead = hmm.Z[ obs[ : , 1: ] ] * beta[ : , 1: ] / c[ : , 1: , None ]
+        transCount += hmm.T * np.einsum( 'btj,bti->ji' , ahead , alpha[ : , :-1 ] )
+        np.add.at( emitCount , obs.ravel() , gamma.reshape( -1 , hmm.N ) )
+        logLike += np.log( c ).sum()
+    return priorCount , transCount , emitCount , logLike
+
+_WORKER_SEQS = None # Sequences held by each pool worker , so only the model is sent every iteration
+
+def _init_worker( seqs ):
+    """ Pool initializer: keep the training sequences in the worker """
+    global _WORKER_SEQS
+    _WORKER_SEQS = seqs
+
+def _estep_shard( args ):
+    """ Pool task: E-step statistics for the sequences [ lo , hi ) under the model ( T , Z , prior ) """
+    ( T , Z , prior , lo , hi ) = args
+    return expected_counts( HMM( T , Z , prior ) , _WORKER_SEQS[ lo : hi ] )
+
+def baum_welch( hmm , seqs , maxIter = 100 , tol = 1e-6 , processes = None , shardsPerProc = 4 ):
+    """ Fit T , Z , and prior to the observation sequences 'seqs' by EM , starting from 'hmm'
+    The E-step runs over shards of 'seqs' in a pool of 'processes' workers ( all cores by default , 1 = no pool ) ,
+    and the counts are summed in the parent. Return the fitted HMM and the log likelihood after each iteration """
+    seqs = list( seqs )
+    processes = processes or cpu_count()
+    nShards = max( 1 , min( len( seqs ) , processes * shardsPerProc ) )
+    bounds = np.linspace( 0 , len( seqs ) , nShards + 1 ).astype( int )
+    pool = Pool( processes , _init_worker , ( seqs , ) ) if processes > 1 else None
+    history = []
+    try:
+        for i in range( maxIter ):
+            tasks = [ ( hmm.T , hmm.Z , hmm.prior , lo , hi ) for lo , hi in zip( bounds[ :-1 ] , bounds[ 1: ] ) ]
+            if pool is not None:
+                results = pool.map( _estep_shard , tasks )
+            else:
+                results = [ expected_counts( hmm , seqs[ lo : hi ] ) for ( _ , _ , _ , lo , hi ) in tasks ]
+            priorCount , transCount , emitCount , logLike = [ sum( part ) for part in zip( *results ) ]
+            history.append( logLike ) # Likelihood of the model that produced these counts
+            hmm = HMM( transCount / transCount.sum( axis = 0 ) ,
+                       emitCount  / emitCount.sum( axis = 0 ) ,
+                       priorCount / priorCount.sum() )
+            if len( history ) > 1 and abs( history[-1] - history[-2] ) < tol * abs( history[-1] ):
+                break
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return hmm , history
+
+# = Program Functions =
+
+def umbrella_HMM():
+    """ The rain / umbrella problem from HMM_01_Intro.py , state and observation 0 = False , 1 = True """
+    T = [ [ 0.7 , 0.3 ] , # r' = F
+          [ 0.3 , 0.7 ] ] # r' = T
+    Z = [ [ 0.8 , 0.1 ] , # u = F
+          [ 0.2 , 0.9 ] ] # u = T
+    return HMM( T , Z )
+
+def random_HMM( N , M , rng = None ):
+    """ Return an HMM with 'N' states and 'M' symbols and random , column-stochastic , models """
+    rng = np.random.RandomState( rng )
+    T = rng.rand( N , N ) + np.eye( N ) * N # Sticky states , so there is something to infer
+    Z = rng.rand( M , N ) ** 4
+    return HMM( T / T.sum( axis = 0 ) , Z / Z.sum( axis = 0 ) )
+
+def seq_accuracy( nfrSeq , truSeq ):
+    """ Calculate the accuracy of state inferences """
+    return np.mean( np.asarray( nfrSeq ) == np.asarray( truSeq ) )
+
+# _ End Func _
+
+
+if __name__ == "__main__":
+    print( __prog_signature__() )
+    
+    # ~ Umbrella problem ~
+    hmm = umbrella_HMM()
+    truth , observs = hmm.sample( 20 , rng = 0 )
+    print( "Truth:" , truth )
+    print( "Obsrv:" , observs )
+    print( "Forwd:" , hmm.forward( observs )[0].argmax( axis = 1 ) , seq_accuracy( hmm.forward( observs )[0].argmax( axis = 1 ) , truth ) )
+    print( "FwBwd:" , hmm.posterior( observs ).argmax( axis = 1 ) , seq_accuracy( hmm.posterior( observs ).argmax( axis = 1 ) , truth ) )
+    print( "Vtrbi:" , hmm.viterbi( observs )[0] , seq_accuracy( hmm.viterbi( observs )[0] , truth ) )
+    
+    # ~ Streaming ~
+    hmm = random_HMM( 4 , 6 , rng = 3 )
+    lag = 5
+    pairs = list( islice( sample_stream( hmm , rng = 4 ) , 20000 ) )
+    truth = [ x for ( x , _ ) in pairs ]
+    t0 = time.time()
+    filt = [ p.argmax() for p in online_filter( hmm , ( o for ( _ , o ) in pairs ) ) ]
+    t1 = time.time()
+    smth = [ p.argmax() for p in fixed_lag_smoother( hmm , ( o for ( _ , o ) in pairs ) , lag ) ]
+    t2 = time.time()
+    print( "Online filter: %.1f us/step , accuracy %.3f ; Fixed-lag %d: %.1f us/step , accuracy %.3f" %
+           ( ( t1 - t0 ) / len( pairs ) * 1e6 , seq_accuracy( filt , truth ) , lag , ( t2 - t1 ) / len( pairs ) * 1e6 , seq_accuracy( smth , truth ) ) )
+    
+    # ~ Timing ~
+    for (N, L, B) in [ ( 2 , 10 ** 6 , None ) , ( 64 , 10 ** 5 , None ) , ( 8 , 10 ** 4 , 100 ) ]:
+        hmm = random_HMM( N , 2 * N , rng = 1 )
+        truth , observs = hmm.sample( L , batch = B , rng = 2 )
+        for name , func in [ ( "forward-backward" , hmm.posterior ) , ( "viterbi" , lambda o: hmm.viterbi( o )[0] ) ]:
+            t0 = time.time()
+            out = func( observs )
+            est = out.argmax( axis = -1 ) if out.ndim == observs.ndim + 1 else out
+            print( "N = %3d , L = %7d , B = %4s : %-16s %6.2f s , accuracy %.3f" % ( N , L , B , name , time.time() - t0 , seq_accuracy( est , truth ) ) )
+
+# ___ End Main _____________________________________________________________________________________________________________________________
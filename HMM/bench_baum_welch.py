@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ~~ Future First ~~
+from __future__ import division , print_function
+
+"""
+bench_baum_welch.py
+Time Baum-Welch training on a fixed synthetic dataset as the number of E-step worker processes grows
+
+Dependencies: numpy
+"""
+
+import time
+from multiprocessing import cpu_count
+
+from HMM_matrix import random_HMM , baum_welch
+
+if __name__ == "__main__":
+    truth = random_HMM( 8 , 12 , rng = 0 )
+    _ , seqs = truth.sample( 500 , batch = 400 , rng = 1 )
+    start = random_HMM( 8 , 12 , rng = 2 )
+    nIter = 10
+    procs = sorted( set( [ 1 , 2 , 4 , cpu_count() ] ) )
+    base = None
+    print( "%d sequences x %d steps , %d EM iterations , %d cores available" % ( len( seqs ) , seqs.shape[1] , nIter , cpu_count() ) )
+    for p in procs:
+        t0 = time.time()
+        fitted , history = baum_welch( start , seqs , maxIter = nIter , tol = 0 , processes = p )
+        dt = time.time() - t0
+        base = base or dt
+        print( "processes = %2d : %6.2f s , speedup x%.2f , final log likelihood %.1f" % ( p , dt , base / dt , history[-1] ) )
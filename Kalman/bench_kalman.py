@@ -0,0 +1,122 @@
+"""
+Timing comparisons for the Kalman filter variants in this folder
+Run from this directory: python bench_kalman.py
+"""
+
+import time
+
+import numpy as np
+
+from kalman_filter import KalmanFilter, KalmanFilterBank
+from kalman_smoother import rts_smoother
+from simulate_model import simulate_system, simulate_batch, simulate_chunks, create_model_parameters
+
+
+def timed( func ):
+    """ Return ( result , seconds ) for one call of 'func' """
+    t0  = time.perf_counter()
+    val = func()
+    return val, time.perf_counter() - t0
+
+
+def bench_bank( N = 2000 , K = 50 ):
+    """ N tracks for K steps: one KalmanFilter per track against a single KalmanFilterBank """
+    (A, H, Q, R) = create_model_parameters()
+    x0 = np.array([0, 0.1, 0, 0.1])
+    meas = np.stack( [ simulate_system( K , x0 )[1] for _ in range( N ) ] , axis = 1 ) # (K, N, n)
+    meas[ ::3 , ::2 , : ] = np.nan # some tracks miss some measurements
+
+    def run_loop():
+        filters = [ KalmanFilter( A , H , Q , R , x0 , np.eye( 4 ) ) for _ in range( N ) ]
+        for k in range( K ):
+            for i, kf in enumerate( filters ):
+                kf.predict()
+                if not np.isnan( meas[ k , i , 0 ] ):
+                    kf.update( meas[ k , i , : ] )
+        return np.array( [ kf.get_state()[0] for kf in filters ] )
+
+    def run_bank():
+        bank = KalmanFilterBank( A , H , Q , R , np.tile( x0 , ( N , 1 ) ) , np.eye( 4 ) )
+        for k in range( K ):
+            bank.predict()
+            bank.update( meas[ k ] )
+        return bank.get_state()[0]
+
+    (x_loop, t_loop) = timed( run_loop )
+    (x_bank, t_bank) = timed( run_bank )
+    print( "Bank of %d tracks x %d steps: loop %.3f s , bank %.3f s , speedup x%.1f , max diff %.2e"
+           % ( N , K , t_loop , t_bank , t_loop / t_bank , np.abs( x_loop - x_bank ).max() ) )
+
+
+def bench_modes( K = 20000 ):
+    """ Long-horizon run of each covariance update mode: time and final covariance symmetry / definiteness """
+    (A, H, Q, R) = create_model_parameters()
+    x0 = np.array([0, 0.1, 0, 0.1])
+    (_, meas) = simulate_system( K , x0 )
+    P_ref = None
+    for mode in KalmanFilter.MODES:
+        def run():
+            kf = KalmanFilter( A , H , Q , R , x0 , 0 * np.eye( 4 ) , mode = mode )
+            for k in range( K ):
+                kf.predict()
+                kf.update( meas[ k , : ] )
+            return kf.get_state()[1]
+        (P, dt) = timed( run )
+        P_ref = P if P_ref is None else P_ref
+        print( "%-8s : %d steps in %.3f s ( %.1f us/step ) , |P - P^T| = %.2e , min eig = %.3e , |P - P_standard| = %.2e"
+               % ( mode , K , dt , dt / K * 1e6 , np.abs( P - P.transpose() ).max() , np.linalg.eigvalsh( P ).min() ,
+                   np.abs( P - P_ref ).max() ) )
+
+
+def bench_steady_state( K = 10 ** 6 ):
+    """ Full recursion against a Riccati-precomputed gain and an online-converged gain on a long sequence """
+    (A, H, Q, R) = create_model_parameters()
+    x0 = np.array([0, 0.1, 0, 0.1])
+    (_, meas) = simulate_system( K , x0 )
+    results = {}
+    for (name, kwargs) in [ ( 'full'     , {} ) ,
+                            ( 'riccati'  , { 'steady_state' : True } ) ,
+                            ( 'converge' , { 'converge_tol' : 1e-10 } ) ]:
+        def run():
+            kf = KalmanFilter( A , H , Q , R , x0 , np.eye( 4 ) , **kwargs )
+            for k in range( K ):
+                kf.predict()
+                kf.update( meas[ k , : ] )
+            return kf.get_state()[0]
+        (x, dt) = timed( run )
+        results[ name ] = ( x , dt )
+        print( "%-8s : %d steps in %.2f s ( %.2f us/step ) , speedup x%.2f , |x - x_full| = %.2e"
+               % ( name , K , dt , dt / K * 1e6 , results[ 'full' ][1] / dt , np.abs( x - results[ 'full' ][0] ).max() ) )
+
+
+def bench_simulate( B = 500 , K = 200 ):
+    """ B trajectories of K steps: repeated simulate_system against one simulate_batch and a chunked stream """
+    x0 = np.array([0, 0.1, 0, 0.1])
+    (_, t_loop)  = timed( lambda: [ simulate_system( K , x0 ) for _ in range( B ) ] )
+    (_, t_batch) = timed( lambda: simulate_batch( B , K , x0 , rng = 0 ) )
+    (_, t_chunk) = timed( lambda: sum( s.shape[0] for (s, _) in simulate_chunks( B , K , x0 , chunk = 100 ) ) )
+    print( "Simulate %d x %d steps: loop %.3f s , batch %.4f s ( x%.0f ) , chunks of 100 %.4f s ( x%.0f )"
+           % ( B , K , t_loop , t_batch , t_loop / t_batch , t_chunk , t_loop / t_chunk ) )
+
+
+def bench_smoother( K = 100000 , checkpoint = 1000 ):
+    """ Offline RTS smoothing of a long log , storing every filtered covariance against checkpointing """
+    (A, H, Q, R) = create_model_parameters()
+    x0 = np.array([0, 0.1, 0, 0.1])
+    (state, meas) = simulate_batch( 1 , K , x0 , rng = 0 )
+    (state, meas) = ( state[0] , meas[0] )
+    ((x_full, _), t_full) = timed( lambda: rts_smoother( A , H , Q , R , x0 , np.eye( 4 ) , meas , return_cov = False ) )
+    ((x_ckpt, _), t_ckpt) = timed( lambda: rts_smoother( A , H , Q , R , x0 , np.eye( 4 ) , meas , checkpoint = checkpoint ,
+                                                         return_cov = False ) )
+    print( "RTS smoother over %d steps: full %.2f s ( %d stored covariances ) , checkpoint %d: %.2f s ( %d ) , max diff %.1e , rmse %.3f"
+           % ( K , t_full , K , checkpoint , t_ckpt , K // checkpoint + checkpoint , np.abs( x_full - x_ckpt ).max() ,
+               np.sqrt( ( ( x_full - state ) ** 2 ).mean() ) ) )
+
+
+if __name__ == '__main__':
+    np.random.seed(21)
+    bench_bank()
+    bench_modes()
+    bench_steady_state()
+    bench_simulate()
+    bench_smoother()
@@ -9,32 +9,205 @@ import numpy as np
 This was introduced in Python 3.5, you can read more about it here under the Notes section.
 """
 
+try:
+    from scipy.linalg import solve_triangular
+except ImportError: # Without SciPy the triangular systems go through the general solver
+    def solve_triangular( L , B , lower = False ):
+        return np.linalg.solve( L , B )
+
+
+def matrix_sqrt( M ):
+    """ Return a square factor F with F @ F.T == M , the Cholesky factor when M is positive definite """
+    try:
+        return np.linalg.cholesky( M )
+    except np.linalg.LinAlgError: # Semi-definite , e.g. a zero initial covariance
+        (w, V) = np.linalg.eigh( M )
+        return V * np.sqrt( np.clip( w , 0 , None ) )
+
+
+def solve_steady_state( A , H , Q , R , tol = 1e-12 , maxIter = 10000 ):
+    """ Iterate the discrete algebraic Riccati equation to its fixed point and return the steady-state
+    gain 'K' and posterior covariance 'P' of a time-invariant system """
+    P = Q.copy() # Predicted covariance
+    for i in range( maxIter ):
+        S = H @ P @ H.transpose() + R
+        K = np.linalg.solve( S , H @ P ).transpose() # P H^T S^-1
+        P_post = P - K @ S @ K.transpose()
+        P_next = A @ P_post @ A.transpose() + Q
+        if np.abs( P_next - P ).max() < tol:
+            break
+        P = P_next
+    return K, P_post
+
+
 class KalmanFilter():
     
-    def __init__( self , A , H , Q , R , x_0 , P_0 ):
-        """ Set the initial state estimate and measurement """
+    # Covariance update modes
+    #   'standard' : K = P H^T inv(S) , P = P - K S K^T
+    #   'cholesky' : S = L L^T , K from triangular solves , P = P - W W^T with W = P H^T L^-T
+    #   'joseph'   : K as 'cholesky' , P = (I - K H) P (I - K H)^T + K R K^T
+    #   'sqrt'     : Propagate a square-root factor of P with QR array updates , P is never formed until asked for
+    MODES = ( 'standard' , 'cholesky' , 'joseph' , 'sqrt' )
+
+    def __init__( self , A , H , Q , R , x_0 , P_0 , mode = 'standard' , steady_state = False , converge_tol = None ):
+        """ Set the initial state estimate and measurement
+        steady_state : Solve the Riccati equation now and run only x = A x + K ( z - H A x ) from the first step
+        converge_tol : Freeze the gain once no element of P changes by more than this across one predict/update """
+        assert mode in self.MODES , "Unknown covariance update mode: " + str( mode )
         
         # Model parameters
         self.A = A
         self.H = H
         self.Q = Q
         self.R = R
+        self.mode = mode
 
         # Initial state
         self._x = x_0
         self._P = P_0
 
+        if mode == 'sqrt':
+            self._sqrtP = matrix_sqrt( P_0 )
+            self._sqrtQ = matrix_sqrt( Q )
+            self._sqrtR = matrix_sqrt( R )
+        elif mode == 'joseph':
+            self._I = np.eye( A.shape[0] )
+
+        # Steady-state gain , once set the covariance is no longer propagated
+        self.converge_tol = converge_tol
+        self._fixedK = None
+        self._P_last = None # Posterior covariance after the previous update
+        if steady_state:
+            self.freeze_gain( *solve_steady_state( A , H , Q , R ) )
+
+    def freeze_gain( self , K , P ):
+        """ Use the constant gain 'K' from now on , reporting 'P' as the ( steady ) covariance """
+        self.K = K
+        self._P = P
+        self._fixedK = K
+        if self.mode == 'sqrt':
+            self._sqrtP = matrix_sqrt( P )
+
+    def is_steady( self ):
+        """ Return True if the filter is running on a frozen gain """
+        return self._fixedK is not None
+
     def predict( self ):
         self._x = self.A @ self._x
-        self._P = self.A @ self._P @ self.A.transpose() + self.Q
+        if self._fixedK is not None:
+            return
+        if self.mode == 'sqrt':
+            # [ A P^1/2 , Q^1/2 ] = L Theta , so L L^T = A P A^T + Q
+            m = self._sqrtP.shape[0]
+            pre = np.hstack( [ self.A @ self._sqrtP , self._sqrtQ ] )
+            self._sqrtP = np.linalg.qr( pre.transpose() , mode = 'r' )[ :m , :m ].transpose()
+        else:
+            self._P = self.A @ self._P @ self.A.transpose() + self.Q
 
     def update(self, z):
-        self.S = self.H @ self._P @ self.H.transpose() + self.R
+        if self._fixedK is not None:
+            self._x = self._x + self._fixedK @ ( z - self.H @ self._x )
+            return
+        if self.mode == 'standard':
+            self.S = self.H @ self._P @ self.H.transpose() + self.R
+            self.V = z - self.H @ self._x
+            self.K = self._P @ self.H.transpose() @ np.linalg.inv(self.S)
+
+            self._x = self._x + self.K @ self.V
+            self._P = self._P - self.K @ self.S @ self.K.transpose()
+        elif self.mode == 'sqrt':
+            self._update_sqrt( z )
+        else:
+            self._update_cholesky( z )
+        if self.converge_tol is not None:
+            P = self.get_state()[1]
+            if self._P_last is not None and np.abs( P - self._P_last ).max() < self.converge_tol:
+                self.freeze_gain( self.K , P )
+            self._P_last = P
+
+    def _update_cholesky( self , z ):
+        """ Inverse-free update: factor S once and use triangular solves for the gain """
+        PHt    = self._P @ self.H.transpose()
+        self.S = self.H @ PHt + self.R
         self.V = z - self.H @ self._x
-        self.K = self._P @ self.H.transpose() @ np.linalg.inv(self.S)
+        L      = np.linalg.cholesky( self.S )
+        Wt     = solve_triangular( L , PHt.transpose() , lower = True ) # W = P H^T L^-T
+        self.K = solve_triangular( L.transpose() , Wt , lower = False ).transpose()
 
         self._x = self._x + self.K @ self.V
-        self._P = self._P - self.K @ self.S @ self.K.transpose()
+        if self.mode == 'joseph':
+            IKH = self._I - self.K @ self.H
+            self._P = IKH @ self._P @ IKH.transpose() + self.K @ self.R @ self.K.transpose()
+        else:
+            self._P = self._P - Wt.transpose() @ Wt
+
+    def _update_sqrt( self , z ):
+        """ Square-root (array) update
+        [ R^1/2  H P^1/2 ]         [ S^1/2  0      ]
+        [ 0      P^1/2   ] Theta = [ Kbar   P+^1/2 ] , K = Kbar S^-1/2 """
+        n = self._sqrtR.shape[0]
+        m = self._sqrtP.shape[0]
+        pre = np.block( [ [ self._sqrtR        , self.H @ self._sqrtP ] ,
+                          [ np.zeros( (m, n) ) , self._sqrtP          ] ] )
+        post = np.linalg.qr( pre.transpose() , mode = 'r' ).transpose()
+        sqrtS = post[ :n , :n ]
+        Kbar  = post[ n: , :n ]
+        self._sqrtP = post[ n: , n: ]
+        self.S = sqrtS @ sqrtS.transpose()
+        self.V = z - self.H @ self._x
+        self.K = solve_triangular( sqrtS.transpose() , Kbar.transpose() , lower = False ).transpose()
+        self._x = self._x + self.K @ self.V
+
+    def get_state(self):
+        if self.mode == 'sqrt':
+            self._P = self._sqrtP @ self._sqrtP.transpose()
+        return self._x, self._P
+
+
+class KalmanFilterBank():
+    """ N independent Kalman filters sharing one model ( A , H , Q , R ), stepped together in batched array operations """
+
+    def __init__( self , A , H , Q , R , x_0 , P_0 ):
+        """ Set the initial state estimates , x_0: (N, m) , and covariances , P_0: (N, m, m) or a shared (m, m) """
+
+        # Model parameters
+        self.A = A
+        self.H = H
+        self.Q = Q
+        self.R = R
+
+        # Initial states
+        self._x = np.array( x_0 , dtype = float )
+        (N, m) = self._x.shape
+        self._P = np.array( np.broadcast_to( P_0 , (N, m, m) ) , dtype = float )
+
+    def predict( self ):
+        self._x = self._x @ self.A.transpose()
+        self._P = self.A @ self._P @ self.A.transpose() + self.Q
+
+    def update( self , z , mask = None ):
+        """ Update with measurements z: (N, n). Tracks where 'mask' is False, or whose row of z contains NaN, keep their prediction """
+        z = np.asarray( z , dtype = float )
+        if mask is None:
+            mask = ~np.isnan( z ).any( axis = 1 )
+        else:
+            mask = np.asarray( mask , dtype = bool )
+        if mask.all():
+            self._x , self._P = self._update_rows( self._x , self._P , z )
+        else:
+            idx = np.flatnonzero( mask )
+            if len( idx ):
+                self._x[ idx ] , self._P[ idx ] = self._update_rows( self._x[ idx ] , self._P[ idx ] , z[ idx ] )
+
+    def _update_rows( self , x , P , z ):
+        """ Batched update of the stacked states 'x' and covariances 'P' with measurements 'z' """
+        PHt = P @ self.H.transpose() #                                  (N, m, n)
+        S   = self.H @ PHt + self.R #                                   (N, n, n)
+        V   = z - x @ self.H.transpose() #                              (N, n)
+        K   = np.linalg.solve( S , PHt.transpose( 0 , 2 , 1 ) ).transpose( 0 , 2 , 1 ) # K = P H^T S^-1 , S is symmetric
+        x = x + ( K @ V[ ... , None ] )[ ... , 0 ]
+        P = P - K @ S @ K.transpose( 0 , 2 , 1 )
+        return x , P
 
     def get_state(self):
         return self._x, self._P
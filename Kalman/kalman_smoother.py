@@ -0,0 +1,99 @@
+"""
+Offline Kalman filtering and Rauch-Tung-Striebel smoothing over a whole logged measurement array
+Same model conventions as kalman_filter.py: x_k = A x_{k-1} + w , z_k = H x_k + v , w ~ N(0, Q) , v ~ N(0, R)
+Rows of 'meas' that contain NaN are treated as missing measurements ( predict only )
+"""
+
+import numpy as np
+
+
+def forward_pass( A , H , Q , R , x_0 , P_0 , meas , x_out = None , P_out = None ):
+    """ Run the filter over meas: (K, n) , writing the filtered x (K, m) and P (K, m, m) into preallocated arrays
+    Return ( x_out , P_out ) """
+    (K, _) = meas.shape
+    m = len( x_0 )
+    x_out = np.empty( ( K , m ) )      if x_out is None else x_out
+    P_out = np.empty( ( K , m , m ) )  if P_out is None else P_out
+    (x, P) = ( x_0 , P_0 )
+    A_T = A.transpose()
+    H_T = H.transpose()
+    for k in range( K ):
+        x = A @ x
+        P = A @ P @ A_T + Q
+        z = meas[ k ]
+        if not np.isnan( z ).any():
+            PHt = P @ H_T
+            S   = H @ PHt + R
+            Kg  = np.linalg.solve( S , PHt.transpose() ).transpose()
+            x   = x + Kg @ ( z - H @ x )
+            P   = P - Kg @ S @ Kg.transpose()
+        x_out[ k ] = x
+        P_out[ k ] = P
+    return x_out , P_out
+
+
+def _smooth_segment( A , Q , x_f , P_f , x_next , P_next , x_s , P_s ):
+    """ RTS backward recursion over one segment of filtered estimates , given the smoothed estimate
+    ( x_next , P_next ) that follows it , writing into x_s and P_s ( P_s may be None ) """
+    A_T = A.transpose()
+    for k in range( len( x_f ) - 1 , -1 , -1 ):
+        x_pred = A @ x_f[ k ]
+        P_pred = A @ P_f[ k ] @ A_T + Q
+        C = np.linalg.solve( P_pred , A @ P_f[ k ] ).transpose() # C = P_f A^T P_pred^-1 , P_pred is symmetric
+        x_next = x_f[ k ] + C @ ( x_next - x_pred )
+        P_next = P_f[ k ] + C @ ( P_next - P_pred ) @ C.transpose()
+        x_s[ k ] = x_next
+        if P_s is not None:
+            P_s[ k ] = P_next
+    return x_next , P_next
+
+
+def rts_smoother( A , H , Q , R , x_0 , P_0 , meas , checkpoint = None , return_cov = None ):
+    """ Smooth the whole measurement log meas: (K, n) , returning x_s (K, m) and P_s (K, m, m) ( None if not 'return_cov' )
+    checkpoint : If given, store the filter state only every 'checkpoint' steps and recompute each segment of
+                 filtered estimates during the backward pass , so working memory is O( K / checkpoint + checkpoint ) covariances
+                 instead of O( K ) , at the cost of running the forward filter twice
+    return_cov : Defaults to True without 'checkpoint' and False with it . Returning P_s always takes O( K ) covariances ,
+                 so 'checkpoint' with 'return_cov = True' only bounds the filter's working memory """
+    if return_cov is None:
+        return_cov = checkpoint is None
+    (K, _) = meas.shape
+    m = len( x_0 )
+    x_s = np.empty( ( K , m ) )
+    P_s = np.empty( ( K , m , m ) ) if return_cov else None
+
+    if checkpoint is None:
+        (x_f, P_f) = forward_pass( A , H , Q , R , x_0 , P_0 , meas )
+        x_s[ -1 ] = x_f[ -1 ]
+        if return_cov:
+            P_s[ -1 ] = P_f[ -1 ]
+        _smooth_segment( A , Q , x_f[ :-1 ] , P_f[ :-1 ] , x_f[ -1 ] , P_f[ -1 ] , x_s , P_s )
+        return x_s , P_s
+
+    # 1. Forward pass , keeping only the state entering each segment
+    starts = list( range( 0 , K , checkpoint ) )
+    x_c = np.empty( ( len( starts ) , m ) )
+    P_c = np.empty( ( len( starts ) , m , m ) )
+    x_seg = np.empty( ( checkpoint , m ) )
+    P_seg = np.empty( ( checkpoint , m , m ) )
+    (x, P) = ( x_0 , P_0 )
+    for (i, k0) in enumerate( starts ):
+        x_c[ i ] , P_c[ i ] = x , P
+        k1 = min( k0 + checkpoint , K )
+        forward_pass( A , H , Q , R , x , P , meas[ k0:k1 ] , x_seg[ :k1 - k0 ] , P_seg[ :k1 - k0 ] )
+        (x, P) = ( x_seg[ k1 - k0 - 1 ].copy() , P_seg[ k1 - k0 - 1 ].copy() )
+
+    # 2. Backward pass , segment by segment from the end , recomputing each segment's filtered estimates
+    (x_next, P_next) = ( None , None )
+    for (i, k0) in reversed( list( enumerate( starts ) ) ):
+        k1 = min( k0 + checkpoint , K )
+        (x_f, P_f) = forward_pass( A , H , Q , R , x_c[ i ] , P_c[ i ] , meas[ k0:k1 ] , x_seg[ :k1 - k0 ] , P_seg[ :k1 - k0 ] )
+        if x_next is None: # Last step of the log: smoothed == filtered
+            (x_next, P_next) = ( x_f[ -1 ].copy() , P_f[ -1 ].copy() )
+            x_s[ K - 1 ] = x_next
+            if return_cov:
+                P_s[ K - 1 ] = P_next
+            (x_f, P_f) = ( x_f[ :-1 ] , P_f[ :-1 ] )
+        (x_next, P_next) = _smooth_segment( A , Q , x_f , P_f , x_next , P_next ,
+                                            x_s[ k0:k0 + len( x_f ) ] , P_s[ k0:k0 + len( x_f ) ] if return_cov else None )
+    return x_s , P_s
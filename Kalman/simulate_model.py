@@ -5,6 +5,8 @@ SOURCE: https://towardsdatascience.com/wtf-is-sensor-fusion-part-2-the-good-old-
 import numpy as np
 import matplotlib.pyplot as plt
 
+from kalman_filter import matrix_sqrt
+
 
 class MotionModel():
     def __init__(self, A, Q):
@@ -81,6 +83,45 @@ def simulate_system(K, x0):
     return state, meas
 
 
+def simulate_batch(B, K, x0, rng=None, params=None):
+    """ Simulate 'B' trajectories of 'K' steps at once, returning state (B, K, m) and meas (B, K, n)
+    'x0' is one initial state (m,) or one per trajectory (B, m); 'rng' is a np.random.RandomState or seed,
+    None draws from the global state set by np.random.seed like simulate_system """
+    (A, H, Q, R) = params if params is not None else create_model_parameters()
+    if rng is None:
+        rng = np.random
+    elif not isinstance(rng, np.random.RandomState):
+        rng = np.random.RandomState(rng)
+    (m, _) = Q.shape
+    (n, _) = R.shape
+
+    # All the noise for every trajectory and step, drawn in bulk from the pre-factored covariances
+    L_Q = matrix_sqrt(Q)
+    L_R = matrix_sqrt(R)
+    state = rng.standard_normal((B, K, m)) @ L_Q.transpose()  # Process noise, overwritten in place with states
+
+    # Propagate all B states together, one step at a time
+    x = np.broadcast_to(x0, (B, m))
+    A_T = A.transpose()
+    for k in range(K):
+        x = x @ A_T + state[:, k, :]
+        state[:, k, :] = x
+
+    meas = state @ H.transpose() + rng.standard_normal((B, K, n)) @ L_R.transpose()
+    return state, meas
+
+
+def simulate_chunks(B, K, x0, chunk=1000, seed=0, params=None):
+    """ Yield ( state , meas ) for 'B' trajectories in chunks of at most 'chunk' trajectories, so datasets larger
+    than memory can be streamed. Each chunk has its own child seed, so the output depends only on 'seed' and 'chunk' """
+    n_chunks = -(-B // chunk)
+    seeds = np.random.RandomState(seed).randint(2 ** 31, size=n_chunks)
+    for (i, child) in enumerate(seeds):
+        b = min(chunk, B - i * chunk)
+        x0_i = x0 if np.ndim(x0) == 1 else x0[i * chunk: i * chunk + b]
+        yield simulate_batch(b, K, x0_i, rng=np.random.RandomState(child), params=params)
+
+
 if __name__ == '__main__':
     np.random.seed(21)
     (state, meas) = simulate_system(K=20, x0=np.array([0, 0.1, 0, 0.1]))
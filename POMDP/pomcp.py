@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ~~ Future First ~~
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
+
+"""
+pomcp.py
+2026 October , Template Version: 2018-01-08
+Online Monte-Carlo tree search planning for POMDPs ( POMCP , Silver & Veness 2010 ) with particle-filter beliefs
+
+Dependencies: numpy
+"""
+__progname__ = "POMCP Planner"
+__version__  = "2026.10"
+
+# === Init Environment =====================================================================================================================
+import sys, os.path
+SOURCEDIR = os.path.dirname( os.path.abspath( __file__ ) ) # URL, dir containing source file: http://stackoverflow.com/a/7783326
+
+# ~~~ Imports ~~~
+# ~~ Standard ~~
+import time
+from math import log , sqrt
+from random import random , randrange , choice , seed
+from bisect import bisect
+# ~~ Special ~~
+import numpy as np
+# ~~ Local ~~
+sys.path.insert( 0 , SOURCEDIR )
+
+# ~~ Script Signature ~~
+def __prog_signature__(): return __progname__ + " , Version " + __version__ # Return a string representing program name and verions
+
+# ___ End Init _____________________________________________________________________________________________________________________________
+
+
+# === Main Application =====================================================================================================================
+
+# = Program Classes =
+
+class Simulator( object ):
+    """ Generative model G( s , a ) -> ( s' , z , r ) for a 'pomdp_solver.POMDP' , using plain Python lists and 'bisect' on
+    cumulative distributions , which is much faster than NumPy for one scalar sample at a time """
+    
+    def __init__( self , pomdp ):
+        self.nA    = pomdp.nA
+        self.gamma = pomdp.gamma
+        self.cumT  = np.cumsum( pomdp.T , axis = 2 ).tolist() # cumT[ a ][ s ]  -> CDF over s'
+        self.cumO  = np.cumsum( pomdp.O , axis = 2 ).tolist() # cumO[ a ][ s' ] -> CDF over z
+        self.R     = pomdp.R.tolist() #                         R[ s ][ a ]
+        self.lastS = pomdp.nS - 1
+        self.lastZ = pomdp.nZ - 1
+        
+    def step( self , s , a ):
+        """ Sample a transition from 's' under 'a' """
+        s2 = min( bisect( self.cumT[ a ][ s ] , random() ) , self.lastS )
+        z  = min( bisect( self.cumO[ a ][ s2 ] , random() ) , self.lastZ )
+        return s2 , z , self.R[ s ][ a ]
+    
+class POMCP( object ):
+    """ Monte-Carlo tree search over action-observation histories
+    The tree is stored as flat lists rather than node objects:
+        History node h : visits[ h ] , particles[ h ] ( list of states ) , and its nA action entries starting at h * nA
+        Action entry e : visitsA[ e ] , valueA[ e ] , children[ e ] ( dict z -> history node ) """
+    
+    def __init__( self , pomdp , c = 10.0 , maxDepth = 50 , nParticles = 1000 , rolloutAction = None ):
+        """ Plan in 'pomdp' with UCB exploration constant 'c' , starting from its uniform belief
+        'rolloutAction' : Function of the rollout depth returning an action ( uniform random if None ) , a cheap
+                          domain-knowledge default policy sharply reduces the variance of leaf estimates """
+        self.sim        = Simulator( pomdp )
+        self.nA         = pomdp.nA
+        self.nS         = pomdp.nS
+        self.c          = c
+        self.maxDepth   = maxDepth
+        self.nParticles = nParticles
+        self.rolloutAction = rolloutAction
+        self.reset( [ randrange( self.nS ) for i in range( nParticles ) ] )
+        
+    def reset( self , particles ):
+        """ Discard the tree and start from a root belief given as a list of state 'particles' """
+        self.visits    = []
+        self.particles = []
+        self.visitsA   = []
+        self.valueA    = []
+        self.children  = []
+        self.root = self._new_node()
+        self.particles[ self.root ] = list( particles )
+        
+    def _new_node( self ):
+        """ Append a history node and its action entries , return its index """
+        h = len( self.visits )
+        self.visits.append( 0 )
+        self.particles.append( [] )
+        self.visitsA.extend( [ 0 ] * self.nA )
+        self.valueA.extend( [ 0.0 ] * self.nA )
+        self.children.extend( {} for a in range( self.nA ) )
+        return h
+    
+    def _rollout( self , s , depth ):
+        """ Discounted return of the rollout policy from 's' """
+        total , discount = 0.0 , 1.0
+        step , nA , gamma , policy = self.sim.step , self.nA , self.sim.gamma , self.rolloutAction
+        for d in range( depth , self.maxDepth ):
+            s , z , r = step( s , policy( d ) if policy else randrange( nA ) )
+            total += discount * r
+            discount *= gamma
+        return total
+    
+    def _ucb_action( self , h , explore = True ):
+        """ Action at 'h' maximizing the UCB1 score ( or just the value if not 'explore' ) , untried actions first """
+        base = h * self.nA
+        logN = log( self.visits[ h ] + 1 )
+        best , bestScore = 0 , -float( 'inf' )
+        for a in range( self.nA ):
+            n = self.visitsA[ base + a ]
+            if n == 0:
+                if explore:
+                    return a
+                continue
+            score = self.valueA[ base + a ] + ( self.c * sqrt( logN / n ) if explore else 0.0 )
+            if score > bestScore:
+                best , bestScore = a , score
+        return best
+    
+    def _simulate( self , s , h , depth ):
+        """ One simulation from state 's' at history node 'h' , return its discounted return """
+        if depth >= self.maxDepth:
+            return 0.0
+        a = self._ucb_action( h )
+        s2 , z , r = self.sim.step( s , a )
+        e = h * self.nA + a
+        child = self.children[ e ].get( z )
+        if child is None: # Leaf: grow the tree by one node and estimate with a rollout
+            child = self._new_node()
+            self.children[ e ][ z ] = child
+            R = r + self.sim.gamma * self._rollout( s2 , depth + 1 )
+        else:
+            R = r + self.sim.gamma * self._simulate( s2 , child , depth + 1 )
+        if len( self.particles[ child ] ) < self.nParticles:
+            self.particles[ child ].append( s2 ) # Particle belief for the child , collected during search
+        self.visits[ h ]  += 1
+        self.visitsA[ e ] += 1
+        self.valueA[ e ]  += ( R - self.valueA[ e ] ) / self.visitsA[ e ]
+        return R
+    
+    def search( self , nSims = None , timeLimit = None ):
+        """ Run simulations from the root belief until 'nSims' simulations or 'timeLimit' seconds , return the best action """
+        assert nSims or timeLimit , "Give a simulation count and/or a wall-clock budget"
+        rootParticles = self.particles[ self.root ]
+        deadline = time.time() + timeLimit if timeLimit else None
+        i = 0
+        while ( nSims is None or i < nSims ):
+            if deadline is not None and i % 64 == 0 and time.time() >= deadline:
+                break
+            self._simulate( choice( rootParticles ) , self.root , 0 )
+            i += 1
+        self.lastSims = i
+        return self._ucb_action( self.root , explore = False )
+    
+    def update( self , a , z ):
+        """ Advance the root to the history ( a , z ) after acting in the real world , re-rooting the tree onto that subtree so its
+        visit counts and values carry over to the next search . Top up the particle belief by rejection sampling from the old root
+        if the subtree has too few particles """
+        e = self.root * self.nA + a
+        oldParticles = self.particles[ self.root ]
+        child = self.children[ e ].get( z )
+        particles = list( self.particles[ child ] ) if child is not None else []
+        tries = 0
+        while len( particles ) < self.nParticles and tries < 100 * self.nParticles:
+            s2 , z2 , _ = self.sim.step( choice( oldParticles ) , a )
+            if z2 == z:
+                particles.append( s2 )
+            tries += 1
+        if not particles: # Particle deprivation , fall back to a uniform belief
+            particles = [ randrange( self.nS ) for i in range( self.nParticles ) ]
+        if child is None: # The search never saw this observation , nothing to keep
+            self.reset( particles )
+        else:
+            self._reroot( child )
+            self.particles[ self.root ] = particles
+    
+    def _reroot( self , h ):
+        """ Keep only the subtree under history node 'h' , copied into fresh compact lists with 'h' as the root ( node 0 ) """
+        nA = self.nA
+        old = ( self.visits , self.particles , self.visitsA , self.valueA , self.children )
+        self.visits , self.particles , self.visitsA , self.valueA , self.children = [] , [] , [] , [] , []
+        newID = { h : self._new_node() }
+        order = [ h ] # Breadth-first , parents are always copied before their children
+        for oldH in order:
+            newH = newID[ oldH ]
+            self.visits[ newH ]    = old[0][ oldH ]
+            self.particles[ newH ] = old[1][ oldH ]
+            for a in range( nA ):
+                oe , ne = oldH * nA + a , newH * nA + a
+                self.visitsA[ ne ] = old[2][ oe ]
+                self.valueA[ ne ]  = old[3][ oe ]
+                for zz , oldChild in old[4][ oe ].items():
+                    newID[ oldChild ] = self._new_node()
+                    self.children[ ne ][ zz ] = newID[ oldChild ]
+                    order.append( oldChild )
+        self.root = 0
+        
+    def belief( self ):
+        """ Histogram of the root particles , an estimate of the current belief """
+        return np.bincount( self.particles[ self.root ] , minlength = self.nS ) / len( self.particles[ self.root ] )
+        
+# _ End Class _
+
+
+if __name__ == "__main__":
+    print( __prog_signature__() )
+    from tiger_door import tiger_POMDP , DoorPair , take_observation , REWARD
+    
+    tiger   = tiger_POMDP()
+    planner = POMCP( tiger , c = 50.0 , maxDepth = 20 , rolloutAction = lambda d: 0 ) # Rollouts keep listening
+    seed( 0 ) # The planner and the demo draw from Python's 'random'
+    np.random.seed( 0 )
+    
+    for ( label , budget ) in [ ( "1000 simulations" , { 'nSims' : 1000 } ) , ( "20 ms" , { 'timeLimit' : 0.02 } ) ]:
+        door = DoorPair( choice( [ "L" , "R" ] ) )
+        planner.reset( [ randrange( tiger.nS ) for i in range( planner.nParticles ) ] )
+        total , nSteps , nSims = 0.0 , 500 , 0
+        t0 = time.time()
+        for step in range( nSteps ):
+            a = planner.search( **budget )
+            nSims += planner.lastSims
+            s = 0 if door.door_with_tiger() == "L" else 1
+            total += REWARD[ ( s , a ) ]
+            if a == 0:
+                planner.update( a , take_observation( door ) )
+            else: # Opening a door resets the problem
+                door = DoorPair( choice( [ "L" , "R" ] ) )
+                planner.reset( [ randrange( tiger.nS ) for i in range( planner.nParticles ) ] )
+        dt = time.time() - t0
+        print( "Budget %-16s : %6.1f decisions/s , %7.0f simulations/s , average reward %.3f" % ( label , nSteps / dt , nSims / dt , total / nSteps ) )
+
+# ___ End Main _____________________________________________________________________________________________________________________________
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ~~ Future First ~~
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
+
+"""
+pomdp_solver.py
+2026 October , Template Version: 2018-01-08
+Discrete POMDP core: matrix belief update and Point-Based Value Iteration ( PBVI ) with alpha-vectors
+
+Dependencies: numpy
+"""
+__progname__ = "POMDP Solver"
+__version__  = "2026.10"
+
+# === Init Environment =====================================================================================================================
+# ~~~ Imports ~~~
+# ~~ Standard ~~
+import time
+# ~~ Special ~~
+import numpy as np
+
+# ~~ Script Signature ~~
+def __prog_signature__(): return __progname__ + " , Version " + __version__ # Return a string representing program name and verions
+
+# ___ End Init _____________________________________________________________________________________________________________________________
+
+
+# === Main Application =====================================================================================================================
+
+# = Program Classes =
+
+class POMDP( object ):
+    """ A discrete POMDP stored as arrays
+        T[ a , s , s' ] = P( s' | s , a )
+        O[ a , s' , z ] = P( z | s' , a ) , the observation received after taking 'a' and landing in s'
+        R[ s , a ]      = Reward for taking 'a' in 's'
+        gamma           = Discount factor """
+    
+    def __init__( self , T , O , R , gamma = 0.95 ):
+        """ Store the model arrays """
+        self.T = np.array( T , dtype = float )
+        self.O = np.array( O , dtype = float )
+        self.R = np.array( R , dtype = float )
+        self.gamma = gamma
+        ( self.nA , self.nS , _ ) = self.T.shape
+        self.nZ = self.O.shape[2]
+        
+    def belief_update( self , b , a , z ):
+        """ Bayes filter: return the belief after taking 'a' from 'b' and observing 'z' , and P( z | b , a ) """
+        # b'( s' ) = \\alpha * P( z | s' , a ) * \\sum_s P( s' | s , a ) b( s )
+        bNext = self.O[ a , : , z ] * b.dot( self.T[ a ] )
+        pZ = bNext.sum()
+        return bNext / pZ , pZ
+    
+    def expected_reward( self , b , a ):
+        """ r( b , a ) = \\sum_s b( s ) r( s , a ) """
+        return b.dot( self.R[ : , a ] )
+        
+# _ End Class _
+
+class AlphaPolicy( object ):
+    """ Piecewise-linear value function: V( b ) = max_k Gamma[ k ] . b , acting with the action attached to the best vector """
+    
+    def __init__( self , Gamma , actions ):
+        self.Gamma   = Gamma # -- (K, S) alpha-vectors
+        self.actions = actions # (K,) action of each alpha-vector
+        
+    def value( self , b ):
+        """ Value of belief(s) 'b' , (S,) or (nB, S) """
+        return ( np.asarray( b ).dot( self.Gamma.T ) ).max( axis = -1 )
+    
+    def action( self , b ):
+        """ Best action for belief 'b' """
+        return self.actions[ np.asarray( b ).dot( self.Gamma.T ).argmax( axis = -1 ) ]
+
+# _ End Class _
+
+
+# = Program Functions =
+
+def prune_dominated( Gamma , actions ):
+    """ Drop duplicate alpha-vectors and those pointwise dominated by another vector """
+    Gamma , keep = np.unique( Gamma , axis = 0 , return_index = True )
+    actions = actions[ keep ]
+    # geq[ i , j ] : vector j >= vector i everywhere , and i != j after de-duplication
+    geq = ( Gamma[ None , : , : ] >= Gamma[ : , None , : ] ).all( axis = 2 )
+    np.fill_diagonal( geq , False )
+    dominated = geq.any( axis = 1 )
+    return Gamma[ ~dominated ] , actions[ ~dominated ]
+
+def point_backup( pomdp , B , Gamma ):
+    """ One PBVI backup of the alpha-vectors 'Gamma' (K, S) at every belief in 'B' (nB, S) , all as array operations
+    Return the new alpha-vectors (nB, S) and their actions (nB,) """
+    # G[ a , z , k , s ] = gamma * \sum_{s'} T( s' | s , a ) O( z | s' , a ) Gamma[ k , s' ] , the back-projection of each vector
+    OG = pomdp.O.transpose( 0 , 2 , 1 )[ : , : , None , : ] * Gamma[ None , None , : , : ] # (A, Z, K, S')
+    G  = pomdp.gamma * np.matmul( OG , pomdp.T.transpose( 0 , 2 , 1 )[ : , None , : , : ] ) # (A, Z, K, S)
+    # For each belief , action , and observation: the back-projected vector that is best at that belief
+    best = np.einsum( 'azks,bs->bazk' , G , B ).argmax( axis = 3 ) # (nB, A, Z)
+    aIdx = np.arange( pomdp.nA )[ None , : , None ]
+    zIdx = np.arange( pomdp.nZ )[ None , None , : ]
+    alphaBA = pomdp.R.T[ None , : , : ] + G[ aIdx , zIdx , best ].sum( axis = 2 ) # (nB, A, S)
+    bestA = np.einsum( 'bas,bs->ba' , alphaBA , B ).argmax( axis = 1 ) # (nB,)
+    return alphaBA[ np.arange( len( B ) ) , bestA ] , bestA
+
+def pbvi( pomdp , B , maxIter = 500 , tol = 1e-6 , prune = True ):
+    """ Point-Based Value Iteration over the belief set 'B' (nB, S) , iterating backups until the values at 'B' change
+    by less than 'tol'. Return an AlphaPolicy and the number of backups performed """
+    # Start from a pessimistic bound: the worst reward min_{s,a} R received forever , min R / ( 1 - gamma ) in every state
+    Gamma   = np.full( ( 1 , pomdp.nS ) , pomdp.R.min() / ( 1.0 - pomdp.gamma ) )
+    actions = np.zeros( 1 , dtype = int )
+    lastVal = None
+    for i in range( maxIter ):
+        Gamma , actions = point_backup( pomdp , B , Gamma )
+        if prune:
+            Gamma , actions = prune_dominated( Gamma , actions )
+        val = B.dot( Gamma.T ).max( axis = 1 )
+        if lastVal is not None and np.abs( val - lastVal ).max() < tol:
+            break
+        lastVal = val
+    return AlphaPolicy( Gamma , actions ) , i + 1
+
+def belief_grid( nS , nPoints , rng = None ):
+    """ Belief points for PBVI: the simplex corners , the uniform belief , and random ( Dirichlet ) beliefs """
+    rng = np.random.RandomState( rng )
+    return np.vstack( [ np.eye( nS ) , np.full( ( 1 , nS ) , 1.0 / nS ) , rng.dirichlet( np.ones( nS ) , max( 0 , nPoints - nS - 1 ) ) ] )
+
+def random_POMDP( nS , nA , nZ , gamma = 0.95 , rng = None ):
+    """ A generated POMDP with sparse-ish random dynamics and informative observations , for scaling tests """
+    rng = np.random.RandomState( rng )
+    T = rng.rand( nA , nS , nS ) ** 8
+    T /= T.sum( axis = 2 , keepdims = True )
+    O = rng.rand( nA , nS , nZ ) ** 4
+    O /= O.sum( axis = 2 , keepdims = True )
+    R = rng.randn( nS , nA )
+    return POMDP( T , O , R , gamma )
+
+# _ End Func _
+
+
+if __name__ == "__main__":
+    print( __prog_signature__() )
+    
+    # ~ Time per backup as the number of states grows ~
+    for nS in [ 2 , 8 , 32 , 128 ]:
+        pomdp = random_POMDP( nS , 4 , 4 , rng = nS )
+        B = belief_grid( nS , 200 , rng = 0 )
+        t0 = time.time()
+        policy , nBackups = pbvi( pomdp , B , maxIter = 50 )
+        dt = time.time() - t0
+        print( "|S| = %4d , |B| = %d : %3d backups , %7.2f ms/backup , %4d alpha-vectors" % ( nS , len( B ) , nBackups , dt / nBackups * 1e3 , len( policy.Gamma ) ) )
+
+# ___ End Main _____________________________________________________________________________________________________________________________
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 
 # ~~ Future First ~~
-from __future__ import division # Future imports must be called before everything else, including triple-quote docs!
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
 
 """
 tiger_door.py , Built on Wing 101 IDE for Python 2.7
@@ -24,6 +24,8 @@ from math import pi , sqrt
 # ~~ Special ~~
 import numpy as np
 # ~~ Local ~~
+sys.path.insert( 0 , SOURCEDIR )
+from pomdp_solver import POMDP , pbvi
 
 # ~~ Constants , Shortcuts , Aliases ~~
 EPSILON = 1e-7
@@ -62,6 +64,8 @@ for state in STATES:
             r =   10
         REWARD[ ( state , action ) ] = r
 PROBSPACE = np.linspace( 0 , 1 , 101 ) # Evenly spaced number line [ 0.0 , 1.0 ] at 0.01 intervals
+OBSERVS   = set( range(2) ) # { 0: Hear Left , 1: Hear Right }
+LISTEN_ACCURACY = 0.85 # ---- Probability that listening reports the door with the tiger
 
 # ~~ Belief ~~
 # Belief state: Probability of S0 vs S1 being true underlying state
@@ -92,9 +96,11 @@ class DoorPair:
         """ Return the door that has the tiger """
         return self.tiger
     
-def take_observation( door , observationModel ):
-    """ Return an observation that simulates listening 'door' , given an 'observationModel' """
-    pass
+def take_observation( door , observationModel = LISTEN_ACCURACY ):
+    """ Return an observation that simulates listening 'door' , given an 'observationModel' ( probability of hearing the
+    correct door ) , { 0: Hear Left , 1: Hear Right } """
+    correct = 0 if door.door_with_tiger() == "L" else 1
+    return correct if np.random.rand() < observationModel else 1 - correct
 
 def reward_for_action( belief , action ):
     """ The expected reward for an action is the reward for acting in a state times the expectation of being in that state, like Expectimax. """
@@ -107,6 +113,23 @@ def reward_for_action( belief , action ):
         #            ^-- Reward for taking the action in this state
     return reward_ba
 
+def tiger_POMDP( listenAccuracy = LISTEN_ACCURACY , gamma = 0.95 ):
+    """ Return the tiger problem as arrays for 'pomdp_solver' , using 'REWARD' """
+    nS , nA , nZ = len( STATES ) , len( ACTIONS ) , len( OBSERVS )
+    T = np.empty( ( nA , nS , nS ) )
+    O = np.empty( ( nA , nS , nZ ) )
+    T[ 0 ] = np.eye( nS ) #                        Listening does not move the tiger ...
+    O[ 0 ] = np.array( [ [ listenAccuracy , 1 - listenAccuracy ] ,
+                         [ 1 - listenAccuracy , listenAccuracy ] ] ) # ... and hears the right door with 'listenAccuracy'
+    T[ 1: ] = 1.0 / nS # --------------------------- Opening a door resets the problem with the tiger placed at random ...
+    O[ 1: ] = 1.0 / nZ # --------------------------- ... and the observation tells us nothing
+    R = np.array( [ [ REWARD[ ( s , a ) ] for a in sorted( ACTIONS ) ] for s in sorted( STATES ) ] , dtype = float )
+    return POMDP( T , O , R , gamma )
+
+def belief_points():
+    """ The 'PROBSPACE' grid as beliefs [ p(S0) , p(S1) ] """
+    return np.column_stack( [ PROBSPACE , 1 - PROBSPACE ] )
+
 # === Main Application =====================================================================================================================
 
 # = Program Vars =
@@ -118,10 +141,34 @@ def reward_for_action( belief , action ):
 # _ End Vars _
 
 if __name__ == "__main__":
-    print __prog_signature__()
+    print( __prog_signature__() )
     termArgs = sys.argv[1:] # Terminal arguments , if they exist
     
-    print "Belief:" , belief
+    print( "Belief:" , belief )
+    
+    # ~ Solve with PBVI over the belief grid ~
+    tiger = tiger_POMDP()
+    policy , nBackups = pbvi( tiger , belief_points() )
+    print( "PBVI: %d backups , %d alpha-vectors" % ( nBackups , len( policy.Gamma ) ) )
+    for p in [ 0.02 , 0.1 , 0.3 , 0.5 , 0.7 , 0.9 , 0.98 ]:
+        print( "p(Tiger Left) = %.2f : action %d , value %.2f" % ( p , policy.action( [ p , 1 - p ] ) , policy.value( [ p , 1 - p ] ) ) )
+    
+    # ~ Run the policy ~
+    np.random.seed( 0 )
+    total = 0.0
+    nSteps = 1000
+    door = DoorPair( np.random.choice( [ "L" , "R" ] ) )
+    b = np.array( [ belief[ s ] for s in sorted( STATES ) ] )
+    for step in range( nSteps ):
+        a = policy.action( b )
+        s = 0 if door.door_with_tiger() == "L" else 1
+        total += REWARD[ ( s , a ) ]
+        if a == 0:
+            b , _ = tiger.belief_update( b , a , take_observation( door ) )
+        else:
+            door = DoorPair( np.random.choice( [ "L" , "R" ] ) )
+            b = np.array( [ 0.5 , 0.5 ] )
+    print( "Average reward over %d steps: %.3f" % ( nSteps , total / nSteps ) )
     
 
 # ___ End Main _____________________________________________________________________________________________________________________________
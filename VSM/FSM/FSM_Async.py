@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__progname__ = "FSM_Async.py"
+__version__  = "2026.10"
+__desc__     = "asyncio runtime hosting many concurrent 'StateMachine's , woken by events and timers"
+"""
+2026 October , Template Version: 2018-05-14
+
+Dependencies: Python 3.7+ ( asyncio )
+"""
+
+
+"""
+~~~ Developmnent Plan ~~~
+[Y] One task per hosted machine , asleep on its inbox until an event for it arrives , 2026-10
+[Y] Per-state timeouts that post a transition on the same event loop , 2026-10
+[Y] Instrumentation: dwell time per state , transition rates , 2026-10
+[Y] Line-oriented socket event source , 2026-10
+[ ] Back-pressure on inboxes
+"""
+
+# === Init Environment =====================================================================================================================
+# ~~~ Prepare Paths ~~~
+import sys, os.path
+SOURCEDIR = os.path.dirname( os.path.abspath( __file__ ) ) # URL, dir containing source file: http://stackoverflow.com/a/7783326
+PARENTDIR = os.path.dirname( SOURCEDIR )
+# ~~ Path Utilities ~~
+def prepend_dir_to_path( pathName ): sys.path.insert( 0 , pathName ) # Might need this to fetch a lib in a parent directory
+
+# ~~~ Imports ~~~
+# ~~ Standard ~~
+import asyncio , inspect , random , time
+from collections import defaultdict
+# ~~ Special ~~
+# ~~ Local ~~
+
+# ~~ Constants , Shortcuts , Aliases ~~
+endl = os.linesep
+
+# ~~ Script Signature ~~
+def __prog_signature__(): return __progname__ + " , Version " + __version__ # Return a string representing program name and verions
+
+# ___ End Init _____________________________________________________________________________________________________________________________
+
+
+# === Main Application =====================================================================================================================
+
+# = Program Classes =
+
+"""
+~~~ Async Runtime ~~~
+
+~~ Hosting ~~
+Each hosted 'StateMachine' gets an inbox ( asyncio.Queue ) and one task that awaits it , so an idle machine costs no CPU
+An event is any cargo for the current state's handler: ( newState , cargo ) = handler( cargo ) , the handler may also be a coroutine
+'None' in an inbox is the poison pill , as in Multithread/multiple_workers.py
+
+~~ Timers ~~
+'set_timeout( state , delay , newState )': a machine that stays in 'state' for 'delay' seconds moves to 'newState'
+The timer posts a 'Timeout' into the inbox , stamped with the machine's transition count so that a timer that fires after the
+machine has already left the state is ignored
+
+"""
+
+class Timeout( object ):
+    """ Timer event , valid only while the machine is still in the transition 'epoch' that armed it """
+    __slots__ = ( 'epoch' , )
+
+    def __init__( self , epoch ):
+        self.epoch = epoch
+
+
+class DwellStats( object ):
+    """ Aggregate instrumentation over every hosted machine: time spent per state visit and counts of each transition """
+
+    def __init__( self , clock ):
+        self.clock       = clock
+        self.t0          = clock()
+        self.dwellTotal  = defaultdict( float ) # State --> Total seconds spent in it ( completed visits )
+        self.dwellCount  = defaultdict( int ) # -- State --> Completed visits
+        self.transitions = defaultdict( int ) # -- ( src , dst ) --> Count
+        self.events      = 0 # ------------------- Events delivered to handlers , including timeouts
+        self.timeouts    = 0 # ------------------- Timer-driven transitions
+
+    def record( self , src , dst , dwell ):
+        """ Log one transition out of 'src' after 'dwell' seconds """
+        self.dwellTotal[ src ] += dwell
+        self.dwellCount[ src ] += 1
+        self.transitions[ ( src , dst ) ] += 1
+
+    def elapsed( self ):
+        """ Seconds since the stats began """
+        return self.clock() - self.t0
+
+    def mean_dwell( self ):
+        """ State --> Mean seconds per completed visit """
+        return { state : self.dwellTotal[ state ] / self.dwellCount[ state ] for state in self.dwellCount }
+
+    def rates( self ):
+        """ ( src , dst ) --> Transitions per second over the elapsed time """
+        span = max( self.elapsed() , 1e-9 )
+        return { edge : count / span for edge , count in self.transitions.items() }
+
+    def report( self ):
+        """ Return a printable table of dwell times and transition rates """
+        lines = [ "%-14s %8s %12s" % ( "State" , "Visits" , "Mean dwell" ) ]
+        for state , mean in sorted( self.mean_dwell().items() ):
+            lines.append( "%-14s %8d %10.4f s" % ( state , self.dwellCount[ state ] , mean ) )
+        lines.append( "%-30s %12s" % ( "Transition" , "Rate" ) )
+        for ( src , dst ) , rate in sorted( self.rates().items() ):
+            lines.append( "%-30s %10.1f /s" % ( src + " -> " + dst , rate ) )
+        return endl.join( lines )
+
+
+class Hosted( object ):
+    """ Bookkeeping for one machine living in the runtime """
+    __slots__ = ( 'key' , 'machine' , 'inbox' , 'timeouts' , 'timer' , 'entered' , 'epoch' , 'task' )
+
+    def __init__( self , key , machine , timeouts ):
+        self.key      = key
+        self.machine  = machine
+        self.inbox    = asyncio.Queue()
+        self.timeouts = timeouts
+        self.timer    = None # Handle of the armed timer , if any
+        self.entered  = 0.0 # - Loop time the current state was entered
+        self.epoch    = 0 # --- Transitions so far , stamps timers
+        self.task     = None
+
+
+class FSMRuntime( object ):
+    """ Host many 'StateMachine's on one event loop , must be created while that loop is running """
+
+    def __init__( self ):
+        self.loop     = asyncio.get_running_loop()
+        self.hosted   = {} # Key --> Hosted , live machines only
+        self.timeouts = {} # State --> ( delay , newState ) , applied to every machine unless overridden at 'spawn'
+        self.stats    = DwellStats( self.loop.time )
+        self.finished = {} # Key --> End state reached
+        self.tasks    = []
+
+    def set_timeout( self , state , delay , newState ):
+        """ Machines that dwell in 'state' for 'delay' seconds move to 'newState' """
+        self.timeouts[ state.upper() ] = ( delay , newState.upper() )
+
+    def spawn( self , key , machine , timeouts = None ):
+        """ Check 'machine' , put it in its start state , and start its task , 'timeouts' overrides the runtime's per state
+        'key' must not belong to a live machine , it can be reused once that machine has finished """
+        if key in self.hosted:
+            raise ValueError( "FSMRuntime.spawn: a live machine is already hosted at key %r" % ( key , ) )
+        machine.init_bgn_end_cond()
+        machine.state = machine.startState
+        table = self.timeouts
+        if timeouts:
+            table = dict( self.timeouts )
+            table.update( { state.upper() : ( delay , newState.upper() ) for state , ( delay , newState ) in timeouts.items() } )
+        h = Hosted( key , machine , table )
+        self.hosted[ key ] = h
+        self._enter( h , machine.startState )
+        h.task = self.loop.create_task( self._host( h ) )
+        self.tasks.append( h.task )
+        return h
+
+    def post( self , key , cargo ):
+        """ Deliver an event to the machine at 'key' , never blocks , events for finished or unknown machines are dropped """
+        h = self.hosted.get( key )
+        if h is not None:
+            h.inbox.put_nowait( cargo )
+            return True
+        return False
+
+    def _enter( self , h , state ):
+        """ Enter 'state': stamp the time and arm its timer , if it has one """
+        h.entered = self.loop.time()
+        h.epoch += 1
+        if state in h.timeouts:
+            delay , _ = h.timeouts[ state ]
+            h.timer = self.loop.call_later( delay , h.inbox.put_nowait , Timeout( h.epoch ) )
+
+    def _transition( self , h , newState ):
+        """ Record the visit that is ending , disarm its timer , enter 'newState' """
+        machine = h.machine
+        newState = newState.upper()
+        self.stats.record( machine.state , newState , self.loop.time() - h.entered )
+        if h.timer is not None:
+            h.timer.cancel()
+            h.timer = None
+        machine.state = newState
+        self._enter( h , newState )
+
+    async def _host( self , h ):
+        """ Task body: sleep on the inbox , run one handler per event , stop on an end state or the poison pill """
+        machine , inbox , stats = h.machine , h.inbox , self.stats
+        try:
+            while True:
+                cargo = await inbox.get()
+                if cargo is None: # Poison pill
+                    break
+                if isinstance( cargo , Timeout ):
+                    if cargo.epoch != h.epoch: # Stale , the machine already left that state
+                        continue
+                    stats.timeouts += 1
+                    newState = h.timeouts[ machine.state ][1]
+                else:
+                    result = machine.handlers[ machine.state ]( cargo )
+                    if inspect.isawaitable( result ):
+                        result = await result
+                    newState , cargo = result
+                stats.events += 1
+                self._transition( h , newState )
+                if machine.state in machine.endStates:
+                    self.finished[ h.key ] = machine.state
+                    break
+        finally:
+            if h.timer is not None:
+                h.timer.cancel()
+            machine.active = False
+            del self.hosted[ h.key ]
+
+    async def join( self ):
+        """ Wait until every spawned machine has stopped """
+        await asyncio.gather( *self.tasks )
+        self.tasks = []
+
+    async def shutdown( self ):
+        """ Poison every live machine and wait for them """
+        for h in list( self.hosted.values() ):
+            h.inbox.put_nowait( None )
+        await self.join()
+
+    async def handle_connection( self , reader , writer ):
+        """ Socket event source for 'asyncio.start_server': one event per line , "<key> <cargo>" , keys are read as strings """
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            parts = line.decode().split( None , 1 )
+            if len( parts ) == 2:
+                self.post( parts[0] , parts[1].strip() )
+        writer.close()
+
+# _ End Classes _
+
+# = Program Functions =
+
+def language_machine():
+    """ The example machine from FSM_Example.py , as a fresh instance """
+    from FSM_Example import StateMachine , start_transitions , python_state_transitions , is_state_transitions , \
+                            not_state_transitions
+    m = StateMachine()
+    m.verbose = False
+    m.add_state( "Start"        , start_transitions        )
+    m.add_state( "Python_state" , python_state_transitions )
+    m.add_state( "is_state"     , is_state_transitions     )
+    m.add_state( "not_state"    , not_state_transitions    )
+    m.add_state( "neg_state"    , None , end_state = 1     )
+    m.add_state( "pos_state"    , None , end_state = 1     )
+    m.add_state( "error_state"  , None , end_state = 1     )
+    m.set_start( "Start" )
+    return m
+
+# _ End Func _
+
+if __name__ == "__main__":
+    print( __prog_signature__() )
+    termArgs = sys.argv[1:] # Terminal arguments , if they exist
+
+    N = int( termArgs[0] ) if termArgs else 10000
+
+    async def demo():
+        """ N machines , each sent one sentence a word at a time at random moments , a quarter of them stall and time out """
+        rt = FSMRuntime()
+        t0 = time.time()
+        rt.set_timeout( "is_state" , 0.5 , "error_state" ) # Give up on a sentence that stops after "is"
+        sentences = [ "Python is great" , "Python is not fun" , "Python is difficult" , "Python is" ]
+        rng = random.Random( 0 )
+        for i in range( N ):
+            rt.spawn( i , language_machine() )
+            t = 0.0
+            for word in rng.choice( sentences ).split():
+                t += rng.uniform( 0.0 , 0.2 )
+                rt.loop.call_later( t , rt.post , i , word )
+
+        # Socket source: a few extra machines driven over a local TCP connection
+        server = await asyncio.start_server( rt.handle_connection , "127.0.0.1" , 0 )
+        port = server.sockets[0].getsockname()[1]
+        for key in [ "tcp0" , "tcp1" ]:
+            rt.spawn( key , language_machine() )
+        reader , writer = await asyncio.open_connection( "127.0.0.1" , port )
+        writer.write( b"tcp0 Python\ntcp1 Perl\ntcp0 is\ntcp0 easy\n" )
+        await writer.drain()
+        writer.close() # The server side reads to EOF and returns on its own
+        await writer.wait_closed()
+
+        await rt.join()
+        dt = time.time() - t0
+        server.close()
+        await server.wait_closed()
+
+        ends = defaultdict( int )
+        for state in rt.finished.values():
+            ends[ state ] += 1
+        print( "%d machines finished in %.2f s , %d events ( %d timeouts )" %
+               ( len( rt.finished ) , dt , rt.stats.events , rt.stats.timeouts ) )
+        print( "End states:" , dict( ends ) , ", over TCP:" , rt.finished[ "tcp0" ] , rt.finished[ "tcp1" ] )
+        print( rt.stats.report() )
+
+        # Burst: every event posted at once , measures the dispatch cost rather than the timers
+        rt = FSMRuntime()
+        t0 = time.time()
+        for i in range( N ):
+            rt.spawn( i , language_machine() )
+            for word in sentences[ i % 3 ].split():
+                rt.post( i , word )
+        await rt.join()
+        dt = time.time() - t0
+        print( "Burst: %d machines , %d events in %.2f s ( %.0f events/s including spawning )" % ( N , rt.stats.events , dt , rt.stats.events / dt ) )
+
+    asyncio.run( demo() )
+
+# ___ End Main _____________________________________________________________________________________________________________________________
+
+
+# === Spare Parts ==========================================================================================================================
+
+
+
+# ___ End Spare ____________________________________________________________________________________________________________________________
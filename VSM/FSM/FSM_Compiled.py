@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# ~~ Future First ~~
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
+
+__progname__ = "FSM_Compiled.py"
+__version__  = "2026.10"
+__desc__     = "Table-driven FSM compiled from 'StateMachine' , for high-rate event classification"
+"""
+2026 October , Template Version: 2018-05-14
+
+Dependencies: numpy
+"""
+
+
+"""
+~~~ Developmnent Plan ~~~
+[Y] Compile state names and input symbols to integer IDs , transition table as an array , 2026-10
+[Y] Client-driven 'update' / 'feed' over a stream of symbol IDs , 2026-10
+[Y] Many independent instances stepped at once as arrays , 2026-10
+[ ] Parallel-prefix composition of transitions for a single very long stream
+"""
+
+# === Init Environment =====================================================================================================================
+# ~~~ Prepare Paths ~~~
+import sys, os.path
+SOURCEDIR = os.path.dirname( os.path.abspath( __file__ ) ) # URL, dir containing source file: http://stackoverflow.com/a/7783326
+PARENTDIR = os.path.dirname( SOURCEDIR )
+# ~~ Path Utilities ~~
+def prepend_dir_to_path( pathName ): sys.path.insert( 0 , pathName ) # Might need this to fetch a lib in a parent directory
+
+# ~~~ Imports ~~~
+# ~~ Standard ~~
+import time
+# ~~ Special ~~
+import numpy as np
+# ~~ Local ~~
+
+# ~~ Constants , Shortcuts , Aliases ~~
+OTHERTOKEN = "\x00" # Probe input that is in no alphabet , its transitions fill the OTHER column
+endl       = os.linesep
+
+# ~~ Script Signature ~~
+def __prog_signature__(): return __progname__ + " , Version " + __version__ # Return a string representing program name and verions
+
+# ___ End Init _____________________________________________________________________________________________________________________________
+
+
+# === Main Application =====================================================================================================================
+
+# = Program Classes =
+
+"""
+~~~ Compiled Finite State Machine ~~~
+
+~~ Tables ~~
+states  : State names , row index = state ID
+symbols : Input symbols , column index = symbol ID , followed by two reserved columns
+    OTHER : Any input not in the alphabet
+    HOLD  : Identity transition , used to pad streams of unequal length in array mode
+table   : (nStates, nSymbols + 2) int array , table[ s , x ] is the state after reading symbol x in state s
+End states absorb: every column of an end-state row points back to itself , so no per-step end check is needed
+
+"""
+
+class CompiledFSM( object ):
+    """ Deterministic FSM as an integer transition table """
+
+    def __init__( self , states , symbols , table , start , endStates ):
+        """ Store the tables , 'table' must already contain the OTHER and HOLD columns , 'start' and 'endStates' are names """
+        self.states    = [ name.upper() for name in states ]
+        self.stateID   = { name : i for i , name in enumerate( self.states ) }
+        self.symbols   = list( symbols )
+        self.symbolID  = { sym : i for i , sym in enumerate( self.symbols ) }
+        self.OTHER     = len( self.symbols )
+        self.HOLD      = len( self.symbols ) + 1
+        self.nSymbols  = len( self.symbols ) + 2
+        self.table     = np.ascontiguousarray( table , dtype = np.intp )
+        self.flat      = self.table.ravel() # ------------------------------------- Flat view for 'np.take' in array mode
+        self.rows      = [ tuple( row ) for row in self.table.tolist() ] # -------- Nested tuples for the scalar loop
+        self.start     = self.stateID[ start.upper() ]
+        self.isEnd     = np.zeros( len( self.states ) , dtype = bool )
+        for name in endStates:
+            self.isEnd[ self.stateID[ name.upper() ] ] = True
+        self.state     = self.start
+
+    @classmethod
+    def from_transitions( cls , transitions , start , endStates , default = None ):
+        """ Build from a dict { ( state , symbol ) : newState } , unlisted inputs go to 'default' ( or stay put if None ) """
+        states  = [ start.upper() ]
+        symbols = []
+        for ( src , sym ) , dst in transitions.items():
+            for name in ( src.upper() , dst.upper() ):
+                if name not in states:
+                    states.append( name )
+            if sym not in symbols:
+                symbols.append( sym )
+        for name in [ nm.upper() for nm in endStates ] + ( [ default.upper() ] if default else [] ):
+            if name not in states:
+                states.append( name )
+        symbolID = { sym : i for i , sym in enumerate( symbols ) }
+        stateID  = { name : i for i , name in enumerate( states ) }
+        table = np.empty( ( len( states ) , len( symbols ) + 2 ) , dtype = np.intp )
+        table[:] = np.arange( len( states ) )[ : , np.newaxis ] if default is None else stateID[ default.upper() ]
+        for ( src , sym ) , dst in transitions.items():
+            table[ stateID[ src.upper() ] , symbolID[ sym ] ] = stateID[ dst.upper() ]
+        return cls._finish( states , symbols , table , start , endStates )
+
+    @classmethod
+    def _finish( cls , states , symbols , table , start , endStates ):
+        """ Make end states absorbing , set the HOLD column to identity , construct """
+        ids = np.arange( len( states ) )
+        table[ : , -1 ] = ids
+        for name in endStates:
+            table[ states.index( name.upper() ) ] = states.index( name.upper() )
+        return cls( states , symbols , table , start , endStates )
+
+    # ~ Encoding ~
+
+    def encode( self , tokens ):
+        """ Map an iterable of input tokens to an array of symbol IDs , tokens outside the alphabet become OTHER """
+        get , other = self.symbolID.get , self.OTHER
+        return np.array( [ get( tok , other ) for tok in tokens ] , dtype = np.intp )
+
+    def encode_text( self , txt ):
+        """ Whitespace-split 'txt' once and encode the words """
+        return self.encode( txt.split() )
+
+    def name( self , stateID ):
+        """ Name of a state ID """
+        return self.states[ stateID ]
+
+    # ~ Single Instance ~
+
+    def reset( self ):
+        """ Return to the start state """
+        self.state = self.start
+
+    def update( self , symbol ):
+        """ Client-driven step: read one symbol ID , return the new state ID """
+        self.state = self.rows[ self.state ][ symbol ]
+        return self.state
+
+    def feed( self , symbols ):
+        """ Read a stream of symbol IDs from the current state , return the final state ID """
+        rows = self.rows
+        s = self.state
+        for x in ( symbols.tolist() if isinstance( symbols , np.ndarray ) else symbols ): # Python ints index tuples fastest
+            s = rows[ s ][ x ]
+        self.state = s
+        return s
+
+    def trace( self , symbols ):
+        """ Like 'feed' , but return the array of states entered after each symbol """
+        rows = self.rows
+        s = self.state
+        out = []
+        for x in ( symbols.tolist() if isinstance( symbols , np.ndarray ) else symbols ):
+            s = rows[ s ][ x ]
+            out.append( s )
+        self.state = s
+        return np.array( out , dtype = np.intp )
+
+    def classify( self , txt ):
+        """ Run one text from the start state , return the name of the state reached """
+        self.reset()
+        return self.name( self.feed( self.encode_text( txt ) ) )
+
+    # ~ Array Mode ~
+
+    def start_states( self , M ):
+        """ Start state for 'M' independent instances: (M,) """
+        return np.full( M , self.start , dtype = np.intp )
+
+    def step_many( self , states , symbols ):
+        """ One transition for each of M instances , 'states' and 'symbols' are (M,) , return the new states (M,) """
+        return np.take( self.flat , states * self.nSymbols + symbols )
+
+    def feed_many( self , symbols , states = None ):
+        """ Run M instances over a (T, M) array of symbol IDs ( row t is every instance's t-th input ) , return the final states (M,)
+        Shorter streams are padded with HOLD , see 'pad_streams' """
+        symbols = np.asarray( symbols , dtype = np.intp )
+        s   = self.start_states( symbols.shape[1] ) if states is None else np.array( states , dtype = np.intp )
+        idx = np.empty_like( s )
+        for row in symbols:
+            np.multiply( s , self.nSymbols , out = idx )
+            idx += row
+            np.take( self.flat , idx , out = s )
+        return s
+
+    def pad_streams( self , streams ):
+        """ Stack a list of M symbol-ID sequences into a (T, M) array , padding the short ones with HOLD """
+        T = max( len( strm ) for strm in streams ) if streams else 0
+        out = np.full( ( T , len( streams ) ) , self.HOLD , dtype = np.intp )
+        for j , strm in enumerate( streams ):
+            out[ : len( strm ) , j ] = strm
+        return out
+
+    def classify_many( self , texts ):
+        """ Run a list of texts as independent instances , return the names of the states reached """
+        final = self.feed_many( self.pad_streams( [ self.encode_text( txt ) for txt in texts ] ) )
+        return [ self.states[ s ] for s in final ]
+
+# _ End Classes _
+
+# = Program Functions =
+
+def compile_machine( machine , alphabet ):
+    """ Compile a 'StateMachine' whose handlers read one token of cargo and choose the next state from that token alone ,
+    by probing every non-end handler with every symbol of 'alphabet' plus one token outside it """
+    states    = [ machine.startState ] + [ name for name in machine.handlers if name != machine.startState ]
+    symbols   = list( alphabet )
+    stateID   = { name : i for i , name in enumerate( states ) }
+    table     = np.empty( ( len( states ) , len( symbols ) + 2 ) , dtype = np.intp )
+    for i , name in enumerate( states ):
+        if name in machine.endStates:
+            continue # Filled in by '_finish'
+        handler = machine.handlers[ name ]
+        for j , sym in enumerate( symbols + [ OTHERTOKEN ] ):
+            newState , cargo = handler( sym )
+            table[ i , j ] = stateID[ newState.upper() ]
+    return CompiledFSM._finish( states , symbols , table , machine.startState , machine.endStates )
+
+# _ End Func _
+
+if __name__ == "__main__":
+    print( __prog_signature__() )
+    termArgs = sys.argv[1:] # Terminal arguments , if they exist
+
+    from FSM_Example import StateMachine , start_transitions , python_state_transitions , is_state_transitions , \
+                            not_state_transitions , positive_adjectives , negative_adjectives
+
+    m = StateMachine()
+    m.verbose = False
+    m.add_state( "Start"        , start_transitions        )
+    m.add_state( "Python_state" , python_state_transitions )
+    m.add_state( "is_state"     , is_state_transitions     )
+    m.add_state( "not_state"    , not_state_transitions    )
+    m.add_state( "neg_state"    , None , end_state = 1     )
+    m.add_state( "pos_state"    , None , end_state = 1     )
+    m.add_state( "error_state"  , None , end_state = 1     )
+    m.set_start( "Start" )
+
+    alphabet = [ "Python" , "is" , "not" ] + positive_adjectives + negative_adjectives
+    fsm = compile_machine( m , alphabet )
+
+    # ~ Agreement with the interpreted machine ~
+    rng   = np.random.RandomState( 0 )
+    words = alphabet + [ "Perl" , "very" ]
+    texts = [ " ".join( rng.choice( words , size = rng.randint( 1 , 6 ) ) ) for i in range( 2000 ) ]
+    texts += [ "Python is great" , "Python is difficult" , "Perl is ugly" , "Python is not fun" ]
+    def interpreted( txt ):
+        m.reset()
+        while True:
+            out = m.update( txt )
+            txt = out[ 'output' ]
+            if not m.active or not txt:
+                return m.state
+    agree = sum( interpreted( txt ) == fsm.classify( txt ) for txt in texts )
+    agreeMany = sum( interpreted( txt ) == res for txt , res in zip( texts , fsm.classify_many( texts ) ) )
+    print( "Agreement with StateMachine.update :" , agree , "/" , len( texts ) , ", array mode" , agreeMany , "/" , len( texts ) )
+    print( [ fsm.classify( txt ) for txt in texts[-4:] ] )
+
+    # ~ Throughput ~
+    N = 10 ** 6
+    stream = rng.randint( fsm.nSymbols - 1 , size = N ) # Any symbol but HOLD
+    t0 = time.time()
+    n = 0
+    m.reset()
+    while n < 10 ** 5: # Interpreted machine , one word per update
+        m.update( "Python is great" )
+        if not m.active:
+            m.reset()
+        n += 1
+    dt = time.time() - t0
+    print( "StateMachine.update : %.2e transitions/s" % ( n / dt ) )
+    fsm.reset()
+    t0 = time.time()
+    fsm.feed( stream )
+    dt = time.time() - t0
+    print( "Compiled feed       : %.2e transitions/s" % ( N / dt ) )
+    for M in [ 1000 , 100000 ]:
+        symbols = rng.randint( fsm.nSymbols - 1 , size = ( 10 ** 7 // M , M ) )
+        t0 = time.time()
+        fsm.feed_many( symbols )
+        dt = time.time() - t0
+        print( "Compiled feed_many  : M = %6d instances , %.2e transitions/s" % ( M , symbols.size / dt ) )
+
+# ___ End Main _____________________________________________________________________________________________________________________________
+
+
+# === Spare Parts ==========================================================================================================================
+
+
+
+# ___ End Spare ____________________________________________________________________________________________________________________________
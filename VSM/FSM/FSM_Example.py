@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 
 # ~~ Future First ~~
-from __future__ import division # Future imports must be called before everything else, including triple-quote docs!
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
 
 __progname__ = "FSM_Example.py"
 __version__  = "2018.11" 
@@ -82,6 +82,7 @@ class StateMachine:
         self.endStates  = [] # -- List of end state names
         self.state      = None #- Current state , Set by previous handler ( Current state is stored here, so not storing current handler )
         self.active     = False # Flag for whether the FSM is running
+        self.verbose    = True # - Print when an end state is reached , turn off for long runs
 
     def add_state( self , name , handler , end_state = False ):
         """ Add a state to the FSM and enforce name formatting , Add to end state list if designated """
@@ -123,7 +124,8 @@ class StateMachine:
             ( newState , cargo ) = handler( cargo )
             # 2. Determine if an ending state was reached as a result of this state. If so, report and exit loop
             if newState.upper() in self.endStates:
-                print "reached" , newState , "which is an end state"
+                if self.verbose:
+                    print( "reached" , newState , "which is an end state" )
                 break 
             # else an exit state was not reached, set the handler for the next state
             else:
@@ -134,14 +136,28 @@ class StateMachine:
         # NOTE: This function assumes an event loop paradigm, and that 'update' will be called by client code
         # NOTE: This function assumes that input data 'cargo' is provided by client code
         
+        # 0. On the first call , check the setup and enter the start state
+        if self.state is None:
+            self.init_bgn_end_cond()
+            self.state = self.startState
+        # An end state has no handler , stay there
+        if self.state in self.endStates:
+            self.active = False
+            return { 'state': self.state , 'output': cargo }
         # 1. Fetch the update function for the current state
         handler = self.handlers[ self.state ]
         # 2. Run this state's update function
         ( newState , cargo ) = handler( cargo )        
-        
-        # FIXME: START HERE , WRITE AN UPDATE ASSUMING CLIENT CODE DRIVES LOOP AND PROVIDES INPUT DATE
-        
+        # 3. Set the next state , deactivate if it is an end state
+        self.state = newState.upper()
+        if self.state in self.endStates:
+            self.active = False
         return { 'state': self.state , 'output': cargo }
+        
+    def reset( self ):
+        """ Forget the current state so that the next 'update' begins from the start state """
+        self.state  = None
+        self.active = False
 
 # _ End Classes _ 
 
@@ -203,7 +219,7 @@ negative_adjectives = ["boring", "difficult", "ugly", "bad"]
 # _ End Vars _
 
 if __name__ == "__main__":
-    print __prog_signature__()
+    print( __prog_signature__() )
     termArgs = sys.argv[1:] # Terminal arguments , if they exist
     
     m = StateMachine()
@@ -258,7 +258,8 @@ class BugAgent( object ):
         """ Populate sensors with observations """
         for sensDex , sensor in enumerate( self.sensors ):
             sensor.observation = sensor.observe( self.state + self.sensorOffsets[ sensDex ] )
-        print( [ sensor.observation for sensor in self.sensors ] )
+        if self.env.verbose:
+            print( [ sensor.observation for sensor in self.sensors ] )
         self.interpret()
     
     def interpret( self ):
@@ -331,6 +332,7 @@ class SliderBugEnv( object ):
         self.ticLen      = 0.05 # ------------------------------- Amount of time to elapse each step
         self.litePosFunc = self.lightFunc_sin # ----------------- Position of the light as a function of the current time
         self.liteIntFunc = self.liteI_invSqr # ------------------ Intensity of the light at the specified postion , given the current light pos
+        self.verbose     = True # ------------------------------- Print every step , turn off for training runs ( see also qlearn_core.py )
         
     def lightFunc_sin( self , t ):
         """ Light position as a sine function of 't' , Default """
@@ -350,14 +352,16 @@ class SliderBugEnv( object ):
         self.t += self.ticLen 
         # 2. Update environment
         self.lightPos = self.litePosFunc( self.t )
-        print( "Light position: {0:6.2f}".format( self.lightPos ) , "  ,  Light intensity at 0 pos: {0:6.2f}".format( 
-                self.liteIntFunc( 0 , self.lightPos ) 
-        ) , 
+        if self.verbose:
+            print "Light position: {0:6.2f}".format( self.lightPos ) , "  ,  Light intensity at 0 pos: {0:6.2f}".format( 
+                    self.liteIntFunc( 0 , self.lightPos ) 
+            ) , 
         # 3. Update agents , Apply transitions resulting from actions
         self.agent.tick()
         state = self.agent.internal
         action = self.agent.action
-        print "Agent Action  :" , self.agent.action
+        if self.verbose:
+            print "Agent Action  :" , self.agent.action
         self.agent.state = transition_model( self , self.agent , self.agent.state , self.agent.action )
         self.agent.observe()
         s_prime = self.agent.internal
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Template Version: 2016-09-05
+
+# ~~ Future First ~~
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
+
+"""
+qlearn_core.py
+2026 October
+Array-backed tabular Q-learning for the Slider Bug problem in VSM_sketch_01_QLearning.py
+States and actions are mapped to integer indices once , Q lives in a NumPy array , and episodes run in a tight loop without printing
+"""
+
+# == Init ==================================================================================================================================
+
+# ~~ Imports ~~
+# ~ Standard ~
+import time
+from math import sin
+from random import random , randrange
+# ~ Special ~
+import numpy as np
+# ~ Local ~
+
+# == End Init ==============================================================================================================================
+
+
+# == Index Maps ==
+
+class IndexMap( object ):
+    """ Two-way map between hashable labels ( states or actions ) and contiguous integer indices """
+    
+    def __init__( self , labels ):
+        self.labels = list( labels )
+        self.index  = { label : i for i , label in enumerate( self.labels ) }
+        
+    def __len__( self ):
+        return len( self.labels )
+    
+    def __getitem__( self , label ):
+        """ Index of 'label' """
+        return self.index[ label ]
+    
+    def label( self , i ):
+        """ Label at index 'i' """
+        return self.labels[ i ]
+
+# == End Maps ==
+
+
+# == Slider Bug Task ==
+
+# ~~ Model Parameters , Same as 'SliderBugEnv' and 'BugAgent' ~~
+_BUGSPEED     = 0.5 # ---------------------- Distance that the bug moves , per step
+_BUGACTIONS   = [ -_BUGSPEED , _BUGSPEED , 0.0 ] # LEFT , RGHT , IDLE
+_BUGSTATES    = [ 0 , 1 , 2 ] # ------------ Left sensor brighter , Right sensor brighter , Equal
+_SLIDESIDE    = 10.0 # --------------------- One-sided range of each slider
+_LIGHTMAX     = 100.0 # -------------------- Maximum intensity of the light
+_TICLEN       = 0.05 # --------------------- Amount of time to elapse each step
+_SENSOROFFSET = 0.5 # ---------------------- Offset from the bug to each sensor
+_MINDIST2     = 1.0 # ---------------------- Squared distance inside which the intensity saturates at '_LIGHTMAX'
+
+STATES  = IndexMap( _BUGSTATES )
+ACTIONS = IndexMap( _BUGACTIONS )
+
+def intensity( x , xLight ):
+    """ Inverse-square light intensity at 'x' , saturating at '_LIGHTMAX' """
+    return _LIGHTMAX / max( ( x - xLight ) ** 2 , _MINDIST2 )
+
+class SliderBugTask( object ):
+    """ Silent , scalar version of 'SliderBugEnv' with the bug folded in: discrete states and actions as indices """
+    
+    def __init__( self , x = 0.0 , t = 0.0 ):
+        self.reset( x , t )
+        
+    def reset( self , x = 0.0 , t = 0.0 ):
+        """ Place the bug at 'x' and the clock at 't' , return the discrete state """
+        self.x = x
+        self.t = t
+        self.lightPos = _SLIDESIDE * sin( t )
+        return self.observe()
+    
+    def observe( self ):
+        """ Discrete state from the two sensors , as in 'BugAgent.interpret' """
+        left  = intensity( self.x - _SENSOROFFSET , self.lightPos )
+        right = intensity( self.x + _SENSOROFFSET , self.lightPos )
+        return 0 if left > right else ( 1 if left < right else 2 )
+    
+    def step( self , a ):
+        """ Advance the light , move the bug by action index 'a' , return ( s' , reward ) """
+        self.t += _TICLEN
+        self.lightPos = _SLIDESIDE * sin( self.t )
+        self.x = min( max( self.x + _BUGACTIONS[ a ] , -_SLIDESIDE ) , _SLIDESIDE )
+        return self.observe() , intensity( self.x , self.lightPos )
+
+class SliderBugVecEnv( object ):
+    """ E independent Slider Bug environments whose state ( light position , bug position , time ) lives in (E,) arrays ,
+    all advanced by one NumPy pass per 'step'. Each environment ends its episode after 'maxSteps' and resets itself """
+    
+    def __init__( self , E , maxSteps = 1000 , randomStart = True , rng = None ):
+        self.E           = E
+        self.maxSteps    = maxSteps
+        self.randomStart = randomStart
+        self.rng         = np.random.RandomState( rng )
+        self.actionMoves = np.array( _BUGACTIONS )
+        self.x        = np.zeros( E ) # Bug positions
+        self.t        = np.zeros( E ) # Clocks
+        self.lightPos = np.zeros( E ) # Light positions
+        self.steps    = np.zeros( E , dtype = int ) # Steps into the current episode
+        self.reset()
+        
+    def reset( self , mask = None ):
+        """ Reset all environments , or those where 'mask' is True , return the observations (E,) """
+        idx = slice( None ) if mask is None else np.flatnonzero( mask )
+        n = self.E if mask is None else len( idx )
+        if self.randomStart: # Random bug position and phase of the light
+            self.x[ idx ] = self.rng.uniform( -_SLIDESIDE , _SLIDESIDE , n )
+            self.t[ idx ] = self.rng.uniform( 0 , 2 * np.pi , n )
+        else:
+            self.x[ idx ] = 0.0
+            self.t[ idx ] = 0.0
+        self.steps[ idx ] = 0
+        self.lightPos[ idx ] = _SLIDESIDE * np.sin( self.t[ idx ] )
+        return self.observe()
+    
+    def intensity( self , x ):
+        """ Inverse-square intensity at positions 'x' (E,) , saturating at '_LIGHTMAX' """
+        return _LIGHTMAX / np.maximum( ( x - self.lightPos ) ** 2 , _MINDIST2 )
+    
+    def observe( self ):
+        """ Discrete states (E,) from the two sensors: 0 left brighter , 1 right brighter , 2 equal """
+        left  = self.intensity( self.x - _SENSOROFFSET )
+        right = self.intensity( self.x + _SENSOROFFSET )
+        return np.where( left > right , 0 , np.where( left < right , 1 , 2 ) )
+    
+    def step( self , actions ):
+        """ Apply action indices (E,) , return ( observations , rewards , dones ) , each (E,)
+        Environments that finish an episode are reset , their observation is the first of the new episode """
+        self.t += _TICLEN
+        self.lightPos = _SLIDESIDE * np.sin( self.t )
+        self.x = np.clip( self.x + self.actionMoves[ actions ] , -_SLIDESIDE , _SLIDESIDE )
+        rewards = self.intensity( self.x )
+        self.steps += 1
+        dones = self.steps >= self.maxSteps
+        if dones.any():
+            self.reset( dones )
+        return self.observe() , rewards , dones
+
+# == End Task ==
+
+
+# == Learners ==
+
+class TabularQ( object ):
+    """ Epsilon-greedy Q-learning with Q stored as an (nS, nA) array """
+    
+    def __init__( self , nS , nA , learnRate = 0.25 , discount = 0.25 , exploreRate = 0.25 ):
+        self.Q = np.zeros( ( nS , nA ) )
+        self.nA          = nA
+        self.learnRate   = learnRate
+        self.discount    = discount
+        self.exploreRate = exploreRate
+        
+    def act( self , s ):
+        """ Explore with probability 'exploreRate' , otherwise greedy """
+        if random() < self.exploreRate:
+            return randrange( self.nA )
+        return int( self.Q[ s ].argmax() )
+    
+    def learn( self , s , a , r , s_prime ):
+        """ Q( s , a ) <- ( 1 - alpha ) Q( s , a ) + alpha ( r + gamma max_a' Q( s' , a' ) ) """
+        self.Q[ s , a ] += self.learnRate * ( r + self.discount * self.Q[ s_prime ].max() - self.Q[ s , a ] )
+        
+    def policy( self ):
+        """ Greedy action index for every state """
+        return self.Q.argmax( axis = 1 )
+
+class BatchTabularQ( object ):
+    """ E independent Q-learners stepped together: Q is (E, nS, nA) and each hyperparameter is a scalar or an (E,) array ,
+    so a whole hyperparameter sweep is one batch """
+    
+    def __init__( self , E , nS , nA , learnRate = 0.25 , discount = 0.25 , exploreRate = 0.25 , rng = None ):
+        self.Q  = np.zeros( ( E , nS , nA ) )
+        self.E  = E
+        self.nA = nA
+        self.learnRate   = np.broadcast_to( np.asarray( learnRate   , dtype = float ) , ( E , ) )
+        self.discount    = np.broadcast_to( np.asarray( discount    , dtype = float ) , ( E , ) )
+        self.exploreRate = np.broadcast_to( np.asarray( exploreRate , dtype = float ) , ( E , ) )
+        self.rng  = np.random.RandomState( rng )
+        self.rows = np.arange( E )
+        
+    def act( self , s ):
+        """ Epsilon-greedy action index for each learner in state s: (E,) """
+        greedy  = self.Q[ self.rows , s ].argmax( axis = 1 )
+        explore = self.rng.rand( self.E ) < self.exploreRate
+        return np.where( explore , self.rng.randint( self.nA , size = self.E ) , greedy )
+    
+    def learn( self , s , a , r , s_prime ):
+        """ One Q-learning update per learner , all arrays of shape (E,) """
+        target = r + self.discount * self.Q[ self.rows , s_prime ].max( axis = 1 )
+        self.Q[ self.rows , s , a ] += self.learnRate * ( target - self.Q[ self.rows , s , a ] )
+        
+    def policy( self ):
+        """ Greedy action index for every learner and state: (E, nS) """
+        return self.Q.argmax( axis = 2 )
+
+# == End Learners ==
+
+
+# == Training Loops ==
+
+def run_episode( agent , task , nSteps ):
+    """ Run 'nSteps' of learning of 'agent' in 'task' , return the total reward """
+    s = task.observe()
+    act , learn , step = agent.act , agent.learn , task.step # Bind once , this loop is the hot path
+    total = 0.0
+    for i in range( nSteps ):
+        a = act( s )
+        s_prime , r = step( a )
+        learn( s , a , r , s_prime )
+        total += r
+        s = s_prime
+    return total
+
+def run_batch( agents , tasks , nSteps ):
+    """ Run 'nSteps' of learning for a 'BatchTabularQ' over a list of E tasks , return the total reward per learner (E,) """
+    s = np.array( [ task.observe() for task in tasks ] )
+    total = np.zeros( len( tasks ) )
+    for i in range( nSteps ):
+        a = agents.act( s )
+        results = [ task.step( a_e ) for task , a_e in zip( tasks , a ) ]
+        s_prime = np.array( [ res[0] for res in results ] )
+        r       = np.array( [ res[1] for res in results ] )
+        agents.learn( s , a , r , s_prime )
+        total += r
+        s = s_prime
+    return total
+
+def run_vec_batch( agents , env , nSteps ):
+    """ Run 'nSteps' of learning for a 'BatchTabularQ' in a 'SliderBugVecEnv' of the same size , return the total reward per learner
+    Terminal steps bootstrap from the next episode's first state , which is harmless for this continuing task """
+    s = env.observe()
+    total = np.zeros( env.E )
+    for i in range( nSteps ):
+        a = agents.act( s )
+        s_prime , r , done = env.step( a )
+        agents.learn( s , a , r , s_prime )
+        total += r
+        s = s_prime
+    return total
+
+# == End Loops ==
+
+
+# == Main ==================================================================================================================================
+
+if __name__ == "__main__":
+    nSteps = 20000
+    
+    # ~ Single agent ~
+    agent = TabularQ( len( STATES ) , len( ACTIONS ) )
+    t0 = time.time()
+    total = run_episode( agent , SliderBugTask() , nSteps )
+    dt = time.time() - t0
+    print( "Single agent : %d steps in %.3f s ( %.0f steps/s ) , mean reward %.2f , policy %s" %
+           ( nSteps , dt , nSteps / dt , total / nSteps , [ ACTIONS.label( a ) for a in agent.policy() ] ) )
+    
+    # ~ Hyperparameter sweep as one batch ~
+    rates = [ 0.05 , 0.1 , 0.25 , 0.5 ]
+    grid  = np.array( [ ( alpha , gamma , eps ) for alpha in rates for gamma in rates for eps in rates ] )
+    agents = BatchTabularQ( len( grid ) , len( STATES ) , len( ACTIONS ) , grid[ : , 0 ] , grid[ : , 1 ] , grid[ : , 2 ] , rng = 0 )
+    t0 = time.time()
+    totals = run_batch( agents , [ SliderBugTask() for e in range( len( grid ) ) ] , nSteps // 10 )
+    dt = time.time() - t0
+    best = totals.argmax()
+    print( "Sweep of %d  : %d env steps in %.3f s ( %.0f steps/s ) , best ( alpha , gamma , epsilon ) = %s , mean reward %.2f" %
+           ( len( grid ) , len( grid ) * nSteps // 10 , dt , len( grid ) * nSteps / 10 / dt , grid[ best ] , totals[ best ] / ( nSteps // 10 ) ) )
+
+    # ~ Vectorized environments ~
+    for E in [ 1000 , 10000 , 100000 ]:
+        env = SliderBugVecEnv( E , rng = 0 )
+        actions = np.random.randint( len( ACTIONS ) , size = E )
+        t0 = time.time()
+        for i in range( 100 ):
+            env.step( actions )
+        dt = time.time() - t0
+        print( "VecEnv E = %6d : %.2e env steps/s" % ( E , E * 100 / dt ) )
+    agents = BatchTabularQ( 10000 , len( STATES ) , len( ACTIONS ) , exploreRate = np.linspace( 0.01 , 0.5 , 10000 ) , rng = 1 )
+    env = SliderBugVecEnv( 10000 , rng = 2 )
+    t0 = time.time()
+    totals = run_vec_batch( agents , env , 200 )
+    dt = time.time() - t0
+    print( "Learning in VecEnv , 10000 agents x 200 steps : %.2e learning steps/s , mean reward %.2f" % ( 10000 * 200 / dt , totals.mean() / 200 ) )
+
+# == End Main ==============================================================================================================================
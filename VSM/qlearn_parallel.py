@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Template Version: 2016-09-05
+
+# ~~ Future First ~~
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
+
+"""
+qlearn_parallel.py
+2026 October
+Actor / learner Q-learning for the Slider Bug , following the Consumer + JoinableQueue pattern of Multithread/multiple_workers.py
+N actor processes each step their own 'SliderBugVecEnv' and send batches of ( s , a , r , s' ) to the learner in the parent process ,
+the learner publishes Q-table snapshots through a shared-memory array that the actors read before every batch
+
+  == NOTES ==
+* Work tickets on the JoinableQueue are the flow control: the learner keeps a fixed number of tickets in flight , so actors can never
+  run more than a few batches ahead of the policy they are sampling from
+* Only the transitions travel through a pickled queue , packed as small-integer arrays . The Q snapshot is never pickled
+* Each batch carries the version of the snapshot it was sampled under . Its staleness is the number of learner updates made since ,
+  'maxStale' drops batches older than that and issues a replacement ticket
+* The learner waits on results with a timeout and checks that every actor is still alive , so a crashed actor raises instead of hanging
+"""
+
+# == Init ==================================================================================================================================
+
+# ~~ Imports ~~
+# ~ Standard ~
+import time , multiprocessing
+try:
+    import queue # Python 3
+except ImportError:
+    import Queue as queue # Python 2
+# ~ Special ~
+import numpy as np
+# ~ Local ~
+from qlearn_core import SliderBugVecEnv , STATES , ACTIONS
+
+# == End Init ==============================================================================================================================
+
+
+# == Shared Q Table ==
+
+class SharedQTable( object ):
+    """ Q-table of shape (nS, nA) in shared memory with a version counter , written by the learner and copied out by the actors """
+
+    def __init__( self , nS , nA ):
+        self.shape   = ( nS , nA )
+        self.buf     = multiprocessing.Array( 'd' , nS * nA ) # Synchronized , carries its own lock
+        self.version = multiprocessing.Value( 'i' , 0 , lock = False ) # Only touched while holding 'buf's lock
+
+    def view( self ):
+        """ Array view on the shared buffer , valid in any process that inherited this object """
+        return np.frombuffer( self.buf.get_obj() ).reshape( self.shape )
+
+    def publish( self , Q ):
+        """ Copy the learner's table into shared memory and bump the version """
+        with self.buf.get_lock():
+            self.view()[:] = Q
+            self.version.value += 1
+
+    def snapshot( self ):
+        """ Return a private copy of the latest table and its version """
+        with self.buf.get_lock():
+            return self.view().copy() , self.version.value
+
+# == End Shared ==
+
+
+# == Actors ==
+
+class Actor( multiprocessing.Process ):
+    """ Worker process: for each ticket on 'task_queue' , step its environments 'nSteps' times under the latest shared Q snapshot
+    and put the transitions on 'result_queue' . 'None' is the poison pill """
+
+    def __init__( self , task_queue , result_queue , sharedQ , E = 1000 , exploreRate = 0.1 , seed = None ):
+        multiprocessing.Process.__init__( self )
+        self.task_queue   = task_queue
+        self.result_queue = result_queue
+        self.sharedQ      = sharedQ
+        self.E            = E
+        self.exploreRate  = exploreRate
+        self.seed         = seed
+
+    def run( self ):
+        """ Do the work """
+        rng = np.random.RandomState( self.seed )
+        env = SliderBugVecEnv( self.E , rng = rng.randint( 2 ** 31 ) )
+        nA  = len( env.actionMoves )
+        s   = env.observe()
+        while True:
+            nSteps = self.task_queue.get()
+            if nSteps is None: # Poison pill
+                self.task_queue.task_done()
+                break
+            Q , version = self.sharedQ.snapshot()
+            S = np.empty( ( nSteps , self.E ) , dtype = np.uint8 )
+            A = np.empty( ( nSteps , self.E ) , dtype = np.uint8 )
+            R = np.empty( ( nSteps , self.E ) )
+            for i in range( nSteps ):
+                a = np.where( rng.rand( self.E ) < self.exploreRate , rng.randint( nA , size = self.E ) , Q[ s ].argmax( axis = 1 ) )
+                S[i] , A[i] = s , a
+                s , R[i] , done = env.step( a )
+            S_prime = np.vstack( ( S[1:] , s[ np.newaxis ] ) ) # Next states are the following rows , the last row comes from 's'
+            self.task_queue.task_done()
+            self.result_queue.put( ( version , S.ravel() , A.ravel() , R.ravel() , S_prime.ravel() ) )
+        return
+
+# == End Actors ==
+
+
+# == Learner ==
+
+class BatchLearner( object ):
+    """ Central Q-learner that consumes transition batches . Each batch moves every visited ( s , a ) cell toward the mean of its
+    TD targets with step 'learnRate' , one update per cell per batch , so the result does not depend on the batch size """
+
+    def __init__( self , nS , nA , learnRate = 0.25 , discount = 0.25 ):
+        self.Q  = np.zeros( ( nS , nA ) )
+        self.nS , self.nA = nS , nA
+        self.learnRate = learnRate
+        self.discount  = discount
+
+    def learn( self , s , a , r , s_prime ):
+        """ Apply one batch of transitions , arrays of equal length """
+        cells  = s.astype( int ) * self.nA + a
+        target = r + self.discount * self.Q.max( axis = 1 )[ s_prime ]
+        counts = np.bincount( cells , minlength = self.Q.size )
+        sums   = np.bincount( cells , weights = target , minlength = self.Q.size )
+        seen   = counts > 0
+        Qflat  = self.Q.ravel()
+        Qflat[ seen ] += self.learnRate * ( sums[ seen ] / counts[ seen ] - Qflat[ seen ] )
+
+    def policy( self ):
+        """ Greedy action index for every state: (nS,) """
+        return self.Q.argmax( axis = 1 )
+
+def next_result( results , actors , timeout ):
+    """ Wait for the next batch on 'results' , checking that all 'actors' are alive before the wait and every 'timeout' seconds
+    during it . If one has died , terminate the rest and raise RuntimeError rather than wait forever """
+    while True:
+        dead = [ w for w in actors if not w.is_alive() ]
+        if dead:
+            for w in actors:
+                if w.is_alive():
+                    w.terminate()
+            raise RuntimeError( "train_parallel: actor %s exited with code %s" % ( dead[0].name , dead[0].exitcode ) )
+        try:
+            return results.get( timeout = timeout )
+        except queue.Empty:
+            pass
+
+def train_parallel( nWorkers , nBatches , nSteps = 100 , E = 1000 , exploreRate = 0.1 , learnRate = 0.25 , discount = 0.25 ,
+                    inFlight = 2 , seed = 0 , maxStale = None , timeout = 5.0 ):
+    """ Learn from 'nBatches' batches of 'nSteps' x 'E' transitions over 'nWorkers' actors
+    Return ( learner , total transitions , mean reward , largest staleness learned from , batches dropped )
+    'inFlight' tickets per actor are kept queued so actors never sit idle while the learner works
+    'maxStale' : Drop batches sampled more than this many learner updates ago , None keeps every batch
+    'timeout'  : Seconds between liveness checks on the actors while waiting for a batch """
+    tasks   = multiprocessing.JoinableQueue()
+    results = multiprocessing.Queue()
+    sharedQ = SharedQTable( len( STATES ) , len( ACTIONS ) )
+    learner = BatchLearner( len( STATES ) , len( ACTIONS ) , learnRate , discount )
+
+    actors = [ Actor( tasks , results , sharedQ , E , exploreRate , seed + i ) for i in range( nWorkers ) ]
+    for w in actors:
+        w.start()
+
+    issued = 0
+    for i in range( min( nBatches , nWorkers * inFlight ) ):
+        tasks.put( nSteps )
+        issued += 1
+
+    total , rewardSum = 0 , 0.0
+    learned , stalest , dropped = 0 , 0 , 0 # 'learned' is also the latest published version
+    while learned < nBatches:
+        version , s , a , r , s_prime = next_result( results , actors , timeout )
+        stale = learned - version # Learner updates since the snapshot the batch was sampled under
+        if maxStale is not None and stale > maxStale:
+            dropped += 1
+            tasks.put( nSteps ) # Replace the ticket so the same number of batches stays in flight
+            continue
+        stalest = max( stalest , stale )
+        learner.learn( s , a , r , s_prime )
+        sharedQ.publish( learner.Q )
+        learned   += 1
+        total     += len( r )
+        rewardSum += r.sum()
+        if issued < nBatches:
+            tasks.put( nSteps )
+            issued += 1
+
+    for i in range( nWorkers ): # One poison pill per actor
+        tasks.put( None )
+    tasks.join()
+    for w in actors:
+        w.join()
+    return learner , total , rewardSum / total , stalest , dropped
+
+# == End Learner ==
+
+
+# == Main =================================================================================================================================
+
+if __name__ == "__main__":
+    nBatches = 40
+    for nWorkers in sorted( set( [ 1 , 2 , multiprocessing.cpu_count() ] ) ):
+        t0 = time.time()
+        learner , total , meanReward , stalest , dropped = train_parallel( nWorkers , nBatches * nWorkers )
+        dt = time.time() - t0
+        print( "%2d actors : %d transitions in %.2f s ( %.2e steps/s ) , mean reward %.2f , max staleness %d , policy %s" %
+               ( nWorkers , total , dt , total / dt , meanReward , stalest , [ ACTIONS.label( a ) for a in learner.policy() ] ) )
+
+# == End Main ==
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Template Version: 2016-09-05
+
+# ~~ Future First ~~
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
+
+"""
+kmeans_ND.py
+2026 October
+Vectorized N-dimensional k-means , generalizing 'kmeans_lloyd_1D' from kmeans-1D.py / SpareParts/TB_Utils.py
+Assignment is one distance computation per chunk of points , centroids are updated with 'np.bincount' , seeding is k-means++ ,
+and 'minibatch_kmeans' streams chunks of a memory-mapped ( n , d ) array so that 10^7 points never have to sit in RAM at once
+
+  == NOTES ==
+* Squared distances are computed as |x|^2 - 2 x.c + |c|^2 , a single matrix product per chunk . 'chunk' rows at a time bounds the
+  ( chunk , k ) temporary
+* An emptied cluster is re-seeded with the point that is currently worst served , rather than left as NaN
+"""
+
+# == Init ==================================================================================================================================
+
+# ~~ Imports ~~
+# ~ Standard ~
+import time , os , tempfile
+# ~ Special ~
+import numpy as np
+# ~ Local ~
+
+# == End Init ==============================================================================================================================
+
+
+# == Assignment ==
+
+def sq_dists( X , C ):
+    """ Squared Euclidean distances between the rows of 'X' (n, d) and the centroids 'C' (k, d): (n, k) """
+    D = np.einsum( 'ij,ij->i' , X , X )[ : , np.newaxis ] - 2.0 * X.dot( C.T ) + np.einsum( 'ij,ij->i' , C , C )[ np.newaxis , : ]
+    return np.maximum( D , 0.0 , out = D ) # Cancellation can leave tiny negatives
+
+def assign( X , C , chunk = 65536 ):
+    """ Nearest centroid for every row of 'X' , return ( labels (n,) , squared distance to that centroid (n,) ) """
+    n = len( X )
+    labels = np.empty( n , dtype = np.intp )
+    dist2  = np.empty( n )
+    for lo in range( 0 , n , chunk ):
+        D = sq_dists( np.asarray( X[ lo : lo + chunk ] , dtype = float ) , C )
+        labels[ lo : lo + chunk ] = D.argmin( axis = 1 )
+        dist2[ lo : lo + chunk ]  = D[ np.arange( len( D ) ) , labels[ lo : lo + chunk ] ]
+    return labels , dist2
+
+def cluster_sums( X , labels , k ):
+    """ Per-cluster coordinate sums (k, d) and member counts (k,) , one 'np.bincount' per dimension """
+    counts = np.bincount( labels , minlength = k )
+    sums   = np.empty( ( k , X.shape[1] ) )
+    for j in range( X.shape[1] ):
+        sums[ : , j ] = np.bincount( labels , weights = X[ : , j ] , minlength = k )
+    return sums , counts
+
+# == End Assignment ==
+
+
+# == Seeding ==
+
+def kmeans_pp( X , k , rng = None , nLocal = None ):
+    """ Greedy k-means++ seeding: draw 'nLocal' candidates with probability proportional to the squared distance to the nearest
+    chosen centroid , keep the one that lowers the total the most ( 'nLocal' = 1 is plain k-means++ ) """
+    rng = rng if isinstance( rng , np.random.RandomState ) else np.random.RandomState( rng )
+    nLocal = nLocal or 2 + int( np.log( k ) )
+    n = len( X )
+    C = np.empty( ( k , X.shape[1] ) )
+    C[0] = X[ rng.randint( n ) ]
+    closest = sq_dists( X , C[ :1 ] ).ravel()
+    for i in range( 1 , k ):
+        total = closest.sum()
+        if total <= 0.0: # Fewer distinct points than clusters , duplicate a centroid
+            C[i:] = C[0]
+            break
+        picks = np.minimum( np.searchsorted( np.cumsum( closest ) , rng.rand( nLocal ) * total ) , n - 1 )
+        trial = np.minimum( closest[ : , np.newaxis ] , sq_dists( X , X[ picks ] ) ) # (n, nLocal)
+        best  = trial.sum( axis = 0 ).argmin()
+        C[i]  = X[ picks[ best ] ]
+        closest = trial[ : , best ].copy()
+    return C
+
+# == End Seeding ==
+
+
+# == Lloyd ==
+
+def kmeans( X , k , maxIter = 300 , tol = 1e-8 , init = None , rng = None , chunk = 65536 ):
+    """ Lloyd's algorithm on 'X' (n, d) , return ( centroids (k, d) , labels (n,) , inertia , iterations )
+    Stops when no label changes or no centroid moves more than 'tol' ( squared ) , 'init' is an optional (k, d) start """
+    X = np.asarray( X , dtype = float )
+    if X.ndim == 1:
+        X = X[ : , np.newaxis ]
+    rng = rng if isinstance( rng , np.random.RandomState ) else np.random.RandomState( rng )
+    C = kmeans_pp( X , k , rng ) if init is None else np.array( init , dtype = float )
+    labels = None
+    for count in range( 1 , maxIter + 1 ):
+        newLabels , dist2 = assign( X , C , chunk )
+        sums , counts = cluster_sums( X , newLabels , k )
+        newC = C.copy()
+        full = counts > 0
+        newC[ full ] = sums[ full ] / counts[ full , np.newaxis ]
+        for j in np.flatnonzero( ~full ): # Re-seed empty clusters with the worst-served points
+            worst = dist2.argmax()
+            newC[j] = X[ worst ]
+            dist2[ worst ] = 0.0
+        shift = ( ( newC - C ) ** 2 ).sum( axis = 1 ).max()
+        C = newC
+        if ( labels is not None and np.array_equal( labels , newLabels ) ) or shift <= tol:
+            labels = newLabels
+            break
+        labels = newLabels
+    labels , dist2 = assign( X , C , chunk )
+    return C , labels , dist2.sum() , count
+
+def kmeans_bounds_1D( dataList , k , **kwargs ):
+    """ Cluster scalars like 'kmeans_lloyd_1D' and return [ ( lo , hi ) , ... ] per cluster , ordered by centroid
+    Raises ValueError if 'k' exceeds the number of distinct values . A cluster that still ends up empty is left out , so in rare
+    cases fewer than 'k' bounds are returned , see kmeans_optimal_1D.py for a method that always returns exactly 'k' """
+    data = np.asarray( dataList , dtype = float )
+    nDistinct = len( np.unique( data ) )
+    if k > nDistinct:
+        raise ValueError( "kmeans_bounds_1D: k = %d exceeds the %d distinct values in the data" % ( k , nDistinct ) )
+    C , labels , inertia , count = kmeans( data , k , **kwargs )
+    bounds = []
+    for j in np.argsort( C[ : , 0 ] ):
+        members = data[ labels == j ]
+        if len( members ):
+            bounds.append( ( members.min().item() , members.max().item() ) )
+    return bounds
+
+# == End Lloyd ==
+
+
+# == Mini-Batch ==
+
+def minibatch_kmeans( X , k , batchSize = 65536 , nEpochs = 3 , nInit = 100000 , rng = None ):
+    """ Mini-batch k-means ( Sculley 2010 ) over 'X' (n, d) , which may be a read-only 'np.memmap' / 'np.load( ... , mmap_mode = 'r' )'
+    Batches are contiguous slices visited in a random order each epoch , so reads stay sequential on disk . Each centroid moves toward
+    its batch mean with rate ( batch members ) / ( all members seen so far ) , the per-center 1/count schedule applied a batch at a time
+    Starts from a short k-means++ seeded Lloyd run on 'nInit' rows sampled without replacement . Return centroids (k, d) """
+    rng = rng if isinstance( rng , np.random.RandomState ) else np.random.RandomState( rng )
+    n = len( X )
+    sample = np.sort( rng.choice( n , size = min( nInit , n ) , replace = False ) )
+    C = kmeans( np.asarray( X[ sample ] , dtype = float ) , k , maxIter = 50 , rng = rng )[0]
+    seen = np.zeros( k )
+    starts = np.arange( 0 , n , batchSize )
+    for epoch in range( nEpochs ):
+        for lo in rng.permutation( starts ):
+            batch = np.asarray( X[ lo : lo + batchSize ] , dtype = float )
+            labels , _ = assign( batch , C , len( batch ) )
+            sums , counts = cluster_sums( batch , labels , k )
+            seen += counts
+            hit = counts > 0
+            C[ hit ] += ( sums[ hit ] - counts[ hit , np.newaxis ] * C[ hit ] ) / seen[ hit , np.newaxis ]
+    return C
+
+def predict( X , C , chunk = 65536 ):
+    """ Stream 'X' in chunks and return ( labels (n,) , inertia ) for fixed centroids 'C' """
+    labels , dist2 = assign( X , C , chunk )
+    return labels , dist2.sum()
+
+# == End Mini-Batch ==
+
+
+# == Main =================================================================================================================================
+
+def blobs( n , centers , spread , rng ):
+    """ 'n' points scattered around the rows of 'centers' , return ( points (n, d) , true labels (n,) ) """
+    truth = rng.randint( len( centers ) , size = n )
+    return centers[ truth ] + spread * rng.randn( n , centers.shape[1] ) , truth
+
+if __name__ == "__main__":
+    rng = np.random.RandomState( 0 )
+
+    # ~ Same output format as 'kmeans_lloyd_1D' ~
+    print( kmeans_bounds_1D( [ 13 , 14 , 15 , 7 , 8 , 9 , 1 , 2 , 3 ] , 3 , rng = 0 ) )
+
+    # ~ In-memory Lloyd ~
+    k = 8
+    centers = rng.uniform( -20 , 20 , ( k , 3 ) )
+    for n in [ 10 ** 5 , 10 ** 6 ]:
+        X , truth = blobs( n , centers , 1.5 , rng )
+        t0 = time.time()
+        C , labels , inertia , count = kmeans( X , k , rng = 1 )
+        dt = time.time() - t0
+        print( "Lloyd      n = %8d , d = 3 , k = %d : %.2f s , %d iterations , inertia / n = %.3f" % ( n , k , dt , count , inertia / n ) )
+
+    # ~ Mini-batch over a memory-mapped file ~
+    n = 10 ** 7
+    path = os.path.join( tempfile.gettempdir() , "kmeans_ND_demo.dat" )
+    data = np.memmap( path , dtype = np.float32 , mode = 'w+' , shape = ( n , 3 ) )
+    for lo in range( 0 , n , 10 ** 6 ):
+        data[ lo : lo + 10 ** 6 ] = blobs( min( 10 ** 6 , n - lo ) , centers , 1.5 , rng )[0]
+    data.flush()
+    del data
+    X = np.memmap( path , dtype = np.float32 , mode = 'r' , shape = ( n , 3 ) )
+    t0 = time.time()
+    C = minibatch_kmeans( X , k , rng = 2 )
+    dt = time.time() - t0
+    labels , inertia = predict( X , C )
+    print( "Mini-batch n = %8d , d = 3 , k = %d : %.2f s ( + %.2f s to label ) , inertia / n = %.3f" %
+           ( n , k , dt , time.time() - t0 - dt , inertia / n ) )
+    print( "Largest centroid error: %.3f" % np.sqrt( sq_dists( centers , C ).min( axis = 1 ) ).max() )
+    del X
+    os.remove( path )
+
+# == End Main ==
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Template Version: 2016-09-05
+
+# ~~ Future First ~~
+from __future__ import division , print_function # Future imports must be called before everything else, including triple-quote docs!
+
+"""
+kmeans_optimal_1D.py
+2026 October
+Exact optimal 1D k-means , a replacement for 'kmeans_lloyd_1D' ( kmeans-1D.py / SpareParts/TB_Utils.py ) that cannot get stuck in a
+local optimum and has no random start . Sorted 1D data has optimal clusters that are contiguous runs , so the problem is a dynamic
+program over split points:
+
+    D[ m , j ] = min_{ i <= j } D[ m - 1 , i - 1 ] + SSE( i .. j ) # Best cost of x[ 0 .. j ] in m clusters , last cluster x[ i .. j ]
+
+SSE( i .. j ) is O(1) from prefix sums of x and x^2 . The best 'i' never decreases as 'j' grows ( SSE satisfies the quadrangle
+inequality ) , so each layer is solved by divide and conquer: the middle 'j' is solved by scanning its window of 'i' , which splits the
+windows of the two halves . Every level of that recursion is done at once as flat NumPy arrays , O(n) work per level , so a layer costs
+O( n log n ) and the whole solution O( k n log n ) with no per-element Python
+
+  == NOTES ==
+* Data is centered before the prefix sums to limit cancellation in S2 - S1^2 / len
+* Ties resolve to the smallest 'i' , so the result is fully deterministic
+"""
+
+# == Init ==================================================================================================================================
+
+# ~~ Imports ~~
+# ~ Standard ~
+import time
+# ~ Special ~
+import numpy as np
+# ~ Local ~
+
+# == End Init ==============================================================================================================================
+
+
+# == Dynamic Program ==
+
+class SegmentCost( object ):
+    """ O(1) sum of squared deviations of any run x[ i .. j ] ( inclusive ) of sorted data , from prefix sums """
+
+    def __init__( self , x ):
+        xc = x - x.mean()
+        self.S1 = np.concatenate( ( [ 0.0 ] , np.cumsum( xc ) ) )
+        self.S2 = np.concatenate( ( [ 0.0 ] , np.cumsum( xc * xc ) ) )
+
+    def __call__( self , i , j ):
+        """ SSE of x[ i .. j ] , 'i' and 'j' may be arrays of equal shape """
+        s1 = self.S1[ j + 1 ] - self.S1[ i ]
+        return np.maximum( self.S2[ j + 1 ] - self.S2[ i ] - s1 * s1 / ( j - i + 1 ) , 0.0 )
+
+def _solve_layer( prev , cost , m , n ):
+    """ Fill layer 'm' ( >= 2 ) from layer 'm - 1' costs 'prev' (n,) , return ( costs (n,) , start of the last cluster (n,) )
+    Entries j < m - 1 cannot hold m nonempty clusters and are left at infinity """
+    D    = np.full( n , np.inf )
+    arg  = np.zeros( n , dtype = np.intp )
+    # Pending subproblems: j in [ jl , jr ] with their optimum known to lie in [ ol , orr ]
+    jl  = np.array( [ m - 1 ] ) ; jr  = np.array( [ n - 1 ] )
+    ol  = np.array( [ m - 1 ] ) ; orr = np.array( [ n - 1 ] )
+    while len( jl ):
+        mid  = ( jl + jr ) // 2
+        hi   = np.minimum( orr , mid )
+        lens = hi - ol + 1
+        offs = np.cumsum( lens ) - lens # ------------------------------------- Start of each window in the flat arrays
+        idx  = np.arange( offs[-1] + lens[-1] )
+        i    = idx + np.repeat( ol - offs , lens ) # -------------------------- Candidate starts of the last cluster
+        val  = prev[ i - 1 ] + cost( i , np.repeat( mid , lens ) )
+        best = np.minimum.reduceat( val , offs )
+        first = np.minimum.reduceat( np.where( val == np.repeat( best , lens ) , idx , len( idx ) ) , offs ) # Smallest i at the min
+        opt  = i[ first ]
+        D[ mid ]   = best
+        arg[ mid ] = opt
+        # Children: left half keeps the lower window up to 'opt' , right half starts its window at 'opt'
+        left  = jl <= mid - 1
+        right = mid + 1 <= jr
+        jl , jr , ol , orr = ( np.concatenate( ( jl[ left ] , mid[ right ] + 1 ) ) ,
+                               np.concatenate( ( mid[ left ] - 1 , jr[ right ] ) ) ,
+                               np.concatenate( ( ol[ left ] , opt[ right ] ) ) ,
+                               np.concatenate( ( opt[ left ] , orr[ right ] ) ) )
+    return D , arg
+
+def optimal_partition_1D( x , k ):
+    """ Optimal k-clustering of sorted 'x' (n,) , return ( starts (k,) index of the first element of each cluster , total SSE ) """
+    n = len( x )
+    if not 1 <= k <= n:
+        raise ValueError( "optimal_partition_1D: need 1 <= k <= len( data ) , got k = %d , n = %d" % ( k , n ) )
+    cost = SegmentCost( x )
+    j    = np.arange( n )
+    D    = cost( np.zeros( n , dtype = np.intp ) , j ) # One cluster
+    args = [ None ]
+    for m in range( 2 , k + 1 ):
+        D , arg = _solve_layer( D , cost , m , n )
+        args.append( arg )
+    # Backtrack the cluster starts from the last element
+    starts = np.zeros( k , dtype = np.intp )
+    end = n - 1
+    for m in range( k , 1 , -1 ):
+        starts[ m - 1 ] = args[ m - 1 ][ end ]
+        end = starts[ m - 1 ] - 1
+    return starts , D[ n - 1 ]
+
+def kmeans_optimal_1D( dataList , k ):
+    """ Drop-in for 'kmeans_lloyd_1D': return the bounds [ ( lo , hi ) , ... ] of the optimal 'k' clusters in ascending order """
+    x = np.sort( np.asarray( dataList , dtype = float ) )
+    starts , sse = optimal_partition_1D( x , k )
+    ends = np.append( starts[1:] - 1 , len( x ) - 1 )
+    return [ ( x[ s ].item() , x[ e ].item() ) for s , e in zip( starts , ends ) ]
+
+# == End DP ==
+
+
+# == Main =================================================================================================================================
+
+def brute_force_1D( x , k ):
+    """ O( k n^2 ) reference DP , for checking on small inputs , return the optimal SSE """
+    n = len( x )
+    cost = SegmentCost( x )
+    D = np.array( [ cost( 0 , j ) for j in range( n ) ] )
+    for m in range( 2 , k + 1 ):
+        D = np.array( [ min( D[ i - 1 ] + cost( i , j ) for i in range( m - 1 , j + 1 ) ) if j >= m - 1 else np.inf
+                        for j in range( n ) ] )
+    return D[ n - 1 ]
+
+if __name__ == "__main__":
+    from kmeans_ND import kmeans
+
+    print( kmeans_optimal_1D( [ 13 , 14 , 15 , 7 , 8 , 9 , 1 , 2 , 3 ] , 3 ) )
+
+    # ~ Exactness against the brute-force DP ~
+    rng = np.random.RandomState( 0 )
+    worst = 0.0
+    for trial in range( 200 ):
+        draw = [ rng.rand , rng.randn , lambda size : rng.exponential( size = size ) ][ trial % 3 ]
+        x = np.sort( np.round( draw( rng.randint( 2 , 40 ) ) , trial % 2 + 1 ) ) # Rounding makes ties
+        k = rng.randint( 1 , len( x ) + 1 )
+        worst = max( worst , abs( optimal_partition_1D( x , k )[1] - brute_force_1D( x , k ) ) )
+    print( "200 random cases , largest SSE difference from brute force: %.2e" % worst )
+
+    # ~ Against Lloyd on millions of points ~
+    k = 8
+    x = np.concatenate( [ rng.normal( mu , 1.0 , 250000 ) for mu in rng.uniform( 0 , 40 , k // 2 ) ] +
+                        [ rng.exponential( 3.0 , 10 ** 6 ) ] )
+    xs = np.sort( x )
+    t0 = time.time()
+    starts , sse = optimal_partition_1D( xs , k )
+    dtDP = time.time() - t0
+    t0 = time.time()
+    bounds = kmeans_optimal_1D( x , k )
+    dtAll = time.time() - t0
+    print( "Optimal DP   n = %d , k = %d : %.2f s ( %.2f s with sorting ) , SSE / n = %.5f" % ( len( x ) , k , dtDP , dtAll , sse / len( x ) ) )
+    for seed in range( 3 ):
+        t0 = time.time()
+        C , labels , inertia , count = kmeans( x , k , rng = seed )
+        print( "Lloyd seed %d n = %d , k = %d : %.2f s , %3d iterations , SSE / n = %.5f" %
+               ( seed , len( x ) , k , time.time() - t0 , count , inertia / len( x ) ) )
+
+# == End Main ==
@@ -6,9 +6,18 @@
 
 from __future__ import division
 
+from collections import OrderedDict
+from numbers import Integral
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # Vectors are optional; without NumPy the vector-* procedures are absent
+
 Symbol = str          # A Lisp Symbol is implemented as a Python str
 List   = list         # A Lisp List is implemented as a Python list
 Number = (int, float) # A Lisp Number is implemented as a Python int or float
+Vector = np.ndarray if np is not None else () # A Lisp Vector is a 1-D float NumPy array
 
 ################ Parsing: parse, tokenize, and read_from_tokens
 
@@ -16,25 +25,103 @@ def parse(program):
     "Read a Scheme expression from a string."
     return read_from_tokens(tokenize(program))
 
+def parse_stream(stream, chunk_size=1 << 16):
+    "Yield the top-level expressions read from a file-like object, one at a time."
+    return read_forms(tokenize_stream(stream, chunk_size))
+
+def parse_file(filename):
+    "Yield the top-level expressions in a file, one at a time."
+    with open(filename) as stream:
+        for x in parse_stream(stream):
+            yield x
+
+CACHE_MAGIC = 'lispy-forms-1' # bump when the parsed representation changes
+
+def parse_file_cached(filename, cache_dir=None):
+    """Return the list of top-level expressions in a file, reusing the parsed forms
+    stored under 'cache_dir' (default: __lispycache__ beside the file) when the SHA-1
+    of the source matches. A changed source is reparsed and its entry rewritten."""
+    import hashlib, marshal, os, sys
+    filename = os.path.abspath(filename)
+    with open(filename, 'rb') as f:
+        source = f.read()
+    digest = hashlib.sha1(source).hexdigest()
+    cache_dir = cache_dir or os.path.join(os.path.dirname(filename), '__lispycache__')
+    cache_file = os.path.join(cache_dir, '%s.py%d%d.marshal' % ((os.path.basename(filename),) + sys.version_info[:2]))
+    try:
+        with open(cache_file, 'rb') as f:
+            magic, cached_digest, forms = marshal.load(f)
+        if magic == CACHE_MAGIC and cached_digest == digest:
+            return forms
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        pass # missing or unreadable entry: reparse
+    forms = list(read_forms(tokenize(source if isinstance(source, str) else source.decode('utf-8'))))
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        tmp_file = '%s.%d.tmp' % (cache_file, os.getpid())
+        with open(tmp_file, 'wb') as f:
+            marshal.dump((CACHE_MAGIC, digest, forms), f)
+        os.rename(tmp_file, cache_file) # atomic, so readers never see half an entry
+    except (IOError, OSError):
+        pass # a read-only tree still loads, just without the cache
+    return forms
+
 def tokenize(s):
-    "Convert a string into a list of tokens."
-    return s.replace('(',' ( ').replace(')',' ) ').split()
+    "Convert a string into an iterator of tokens."
+    return iter(s.replace('(',' ( ').replace(')',' ) ').split())
 
-def read_from_tokens(tokens):
-    "Read an expression from a sequence of tokens."
-    if len(tokens) == 0:
-        raise SyntaxError('unexpected EOF while reading')
-    token = tokens.pop(0)
-    if '(' == token:
-        L = []
-        while tokens[0] != ')':
-            L.append(read_from_tokens(tokens))
-        tokens.pop(0) # pop off ')'
-        return L
-    elif ')' == token:
-        raise SyntaxError('unexpected )')
+def tokenize_stream(stream, chunk_size=1 << 16):
+    """Yield tokens from a file-like object (e.g. an open file or socket.makefile()) or a
+    socket, reading at most 'chunk_size' characters at a time; a token cut off at the end
+    of a chunk is carried over to the next one. Each read returns whatever has arrived
+    (recv, read1, or else one line), so a form is yielded as soon as it is complete
+    instead of waiting for a full chunk or EOF."""
+    if hasattr(stream, 'recv'):
+        read = stream.recv
+    elif hasattr(stream, 'read1'):
+        read = stream.read1
     else:
-        return atom(token)
+        read = stream.readline
+    partial = ''
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        tokens = (partial + chunk).replace('(',' ( ').replace(')',' ) ').split()
+        partial = ''
+        if tokens and not chunk[-1].isspace() and chunk[-1] not in '()':
+            partial = tokens.pop()
+        for token in tokens:
+            yield token
+    if partial:
+        yield partial
+
+def read_forms(tokens):
+    "Yield each complete top-level expression from an iterator of tokens."
+    stack = [] # the lists still open, innermost last
+    for token in tokens:
+        if '(' == token:
+            stack.append([])
+            continue
+        elif ')' == token:
+            if not stack:
+                raise SyntaxError('unexpected )')
+            exp = stack.pop()
+        else:
+            exp = atom(token)
+        if stack:
+            stack[-1].append(exp)
+        else:
+            yield exp
+    if stack:
+        raise SyntaxError('unexpected EOF while reading')
+
+def read_from_tokens(tokens):
+    "Read an expression from a sequence or iterator of tokens."
+    for exp in read_forms(iter(tokens)):
+        return exp
+    raise SyntaxError('unexpected EOF while reading')
 
 def atom(token):
     "Numbers become numbers; every other token is a symbol."
@@ -67,6 +154,9 @@ def standard_env():
         'list':    lambda *x: list(x), 
         'list?':   lambda x: isinstance(x,list), 
         'map':     map,
+        'memoize': lambda proc, maxsize=1024: MemoProcedure(proc, maxsize),
+        'memo-stats':  lambda f: f.stats(),
+        'memo-clear!': lambda f: f.clear(),
         'max':     max,
         'min':     min,
         'not':     op.not_,
@@ -76,8 +166,67 @@ def standard_env():
         'round':   round,
         'symbol?': lambda x: isinstance(x, Symbol),
     })
+    if np is not None:
+        env.update(vector_procedures())
     return env
 
+def vector_procedures():
+    """NumPy-backed vector procedures. The arithmetic and comparison operators above
+    already broadcast over vectors, so (* 2 v) or (+ v w) is a single NumPy call."""
+    return {
+        'vector':         lambda *x: np.array(x, dtype=float),
+        'make-vector':    lambda n, fill=0.0: np.full(n, fill, dtype=float),
+        'vector-range':   lambda *x: np.arange(*x, dtype=float),
+        'linspace':       lambda a, b, n: np.linspace(a, b, n),
+        'list->vector':   lambda x: np.array(x, dtype=float),
+        'vector->list':   lambda v: v.tolist(),
+        'vector?':        lambda x: isinstance(x, Vector),
+        'vector-length':  len,
+        'vector-ref':     lambda v, i: v[i],
+        'vector-slice':   lambda v, i, j: v[i:j],
+        'vector-append':  lambda *vs: np.concatenate(vs),
+        'vector-map':     vector_map,
+        'vector-map-broadcast': vector_map_broadcast,
+        'vector-sum':     np.sum,
+        'vector-mean':    np.mean,
+        'vector-max':     np.max,
+        'vector-min':     np.min,
+        'dot':            np.dot,
+    }
+
+def vector_map(proc, *vectors):
+    """Apply proc elementwise over vectors. One-argument math functions in MATH_UFUNCS and
+    the operators in ELEMENTWISE_OPS run as one NumPy call; anything else, including every
+    Procedure, is called once per element. Where NumPy would only warn (sqrt of a negative,
+    division by zero) the scalar loop is rerun so the usual Python error is raised. Use
+    vector-map-broadcast to opt in to calling a Procedure on the whole vectors."""
+    import math, operator as op
+    name = getattr(proc, '__name__', '')
+    fast = None
+    if getattr(math, name, None) is proc and name in MATH_UFUNCS and len(vectors) == 1:
+        fast = getattr(np, MATH_UFUNCS[name])
+    elif getattr(op, name, None) is proc and name in ELEMENTWISE_OPS:
+        fast = proc
+    if fast is not None:
+        try:
+            with np.errstate(all='raise'):
+                return fast(*vectors)
+        except FloatingPointError:
+            pass
+    return np.array([proc(*xs) for xs in zip(*vectors)], dtype=float)
+
+MATH_UFUNCS = {'sqrt': 'sqrt', 'exp': 'exp', 'log': 'log', 'log10': 'log10',
+               'sin': 'sin', 'cos': 'cos', 'tan': 'tan', 'atan': 'arctan',
+               'fabs': 'fabs', 'floor': 'floor', 'ceil': 'ceil'}
+ELEMENTWISE_OPS = ('add', 'sub', 'mul', 'div', 'truediv', 'pow', 'neg', 'abs',
+                   'gt', 'lt', 'ge', 'le', 'eq')
+
+def vector_map_broadcast(proc, *vectors):
+    """Call proc once on the whole vectors. Only correct when every operation in its body
+    broadcasts elementwise: (lambda (x) (* x x)) qualifies, a body that reduces the
+    vector (vector-sum, vector-max) or branches with if does not."""
+    return np.asarray(proc(*vectors), dtype=float)
+
 class Env(dict):
     "An environment: a dict of {'var':val} pairs, with an outer Env."
     def __init__(self, parms=(), args=(), outer=None):
@@ -91,17 +240,31 @@ global_env = standard_env()
 
 ################ Interaction: A REPL
 
-def repl(prompt='lis.py> '):
-    "A prompt-read-eval-print loop."
+def repl(prompt='lis.py> ', evaluator=None):
+    "A prompt-read-eval-print loop. Pass evaluator=compile_eval for the closure compiler."
+    evaluator = evaluator or eval
     while True:
-        val = eval(parse(raw_input(prompt)))
+        val = evaluator(parse(raw_input(prompt)))
         if val is not None: 
             print(lispstr(val))
 
+def load(filename, evaluator=None, env=global_env, cache=True):
+    """Evaluate each top-level expression in a file; return the last value.
+    With cache=True the parsed forms come from parse_file_cached, otherwise
+    they are evaluated as they are read."""
+    evaluator = evaluator or eval
+    forms = parse_file_cached(filename) if cache else parse_file(filename)
+    val = None
+    for x in forms:
+        val = evaluator(x, env)
+    return val
+
 def lispstr(exp):
     "Convert a Python object back into a Lisp-readable string."
     if  isinstance(exp, list):
         return '(' + ' '.join(map(lispstr, exp)) + ')' 
+    elif isinstance(exp, Vector):
+        return '#(' + ' '.join(map(lispstr, exp.tolist())) + ')'
     else:
         return str(exp)
 
@@ -114,31 +277,255 @@ class Procedure(object):
     def __call__(self, *args): 
         return eval(self.body, Env(self.parms, args, self.env))
 
+class MemoProcedure(object):
+    "A pure procedure wrapped in a bounded LRU cache keyed on its argument tuple."
+    def __init__(self, proc, maxsize=1024):
+        if isinstance(maxsize, bool) or not isinstance(maxsize, Integral):
+            raise TypeError('memoize: maxsize must be an integer, got %s' % lispstr(maxsize))
+        self.proc, self.maxsize = proc, maxsize
+        self.cache = OrderedDict() # least recently used first
+        self.hits = self.misses = 0
+    def __call__(self, *args):
+        if self.maxsize <= 0: # caching disabled
+            self.misses += 1
+            return self.proc(*args)
+        try:
+            val = self.cache.pop(args)
+        except KeyError:
+            val = self.proc(*args)
+            self.misses += 1
+            if self.cache and len(self.cache) >= self.maxsize:
+                self.cache.popitem(last=False)
+        except TypeError: # unhashable arguments, e.g. lists, bypass the cache
+            return self.proc(*args)
+        else:
+            self.hits += 1
+        self.cache[args] = val
+        return val
+    def stats(self):
+        "Return [hits misses size maxsize] as a Lisp list."
+        return [self.hits, self.misses, len(self.cache), self.maxsize]
+    def clear(self):
+        self.cache.clear()
+        self.hits = self.misses = 0
+
 ################ eval
 
 def eval(x, env=global_env):
-    "Evaluate an expression in an environment."
+    "Evaluate an expression in an environment. Tail calls loop here instead of recursing."
+    while True:
+        if isinstance(x, Symbol):      # variable reference
+            return env.find(x)[x]
+        elif not isinstance(x, List):  # constant literal
+            return x
+        elif x[0] == 'quote':          # (quote exp)
+            (_, exp) = x
+            return exp
+        elif x[0] == 'if':             # (if test conseq alt)
+            (_, test, conseq, alt) = x
+            x = (conseq if eval(test, env) else alt)
+        elif x[0] == 'define':         # (define var exp)
+            (_, var, exp) = x
+            env[var] = eval(exp, env)
+            return None
+        elif x[0] == 'define-memo':    # (define-memo var exp [maxsize])
+            (var, exp), maxsize = x[1:3], x[3:]
+            env[var] = MemoProcedure(eval(exp, env), *maxsize)
+            return None
+        elif x[0] == 'set!':           # (set! var exp)
+            (_, var, exp) = x
+            env.find(var)[var] = eval(exp, env)
+            return None
+        elif x[0] == 'lambda':         # (lambda (var...) body)
+            (_, parms, body) = x
+            return Procedure(parms, body, env)
+        elif x[0] == 'begin':          # (begin exp+)
+            for exp in x[1:-1]:
+                eval(exp, env)
+            x = x[-1]
+        else:                          # (proc arg...)
+            proc = eval(x[0], env)
+            args = [eval(exp, env) for exp in x[1:]]
+            if isinstance(proc, Procedure):
+                x, env = proc.body, Env(proc.parms, args, proc.env)
+            else:
+                return proc(*args)
+
+################ Compile-to-closure: analyze and compile_eval
+
+def compile_eval(x, env=global_env):
+    "Evaluate an expression by first compiling it to a closure (see analyze)."
+    return analyze(x)(env)
+
+def analyze(x, scope=(), tail=False):
+    """Convert an expression into a closure of one argument, env.
+    All syntax dispatch happens once, here, rather than on every evaluation.
+    'scope' is a tuple of the variable lists of the enclosing lambdas, innermost
+    first; local variables compile to (depth, index) slot accesses, while free
+    variables are looked up in the global Env. Applications in 'tail' position
+    return a TailCall for the calling CompiledProcedure to run in its own loop."""
     if isinstance(x, Symbol):      # variable reference
-        return env.find(x)[x]
+        return analyze_variable(x, scope)
     elif not isinstance(x, List):  # constant literal
-        return x                
+        return lambda env: x
     elif x[0] == 'quote':          # (quote exp)
         (_, exp) = x
-        return exp
+        return lambda env: exp
     elif x[0] == 'if':             # (if test conseq alt)
         (_, test, conseq, alt) = x
-        exp = (conseq if eval(test, env) else alt)
-        return eval(exp, env)
+        ftest = analyze(test, scope)
+        fconseq, falt = analyze(conseq, scope, tail), analyze(alt, scope, tail)
+        return lambda env: fconseq(env) if ftest(env) else falt(env)
     elif x[0] == 'define':         # (define var exp)
         (_, var, exp) = x
-        env[var] = eval(exp, env)
+        return analyze_assignment(var, analyze(exp, scope), scope, define=True)
+    elif x[0] == 'define-memo':    # (define-memo var exp [maxsize])
+        (var, exp), maxsize = x[1:3], x[3:]
+        fexp = analyze(exp, scope)
+        fmemo = lambda env: MemoProcedure(fexp(env), *maxsize)
+        return analyze_assignment(var, fmemo, scope, define=True)
     elif x[0] == 'set!':           # (set! var exp)
         (_, var, exp) = x
-        env.find(var)[var] = eval(exp, env)
+        return analyze_assignment(var, analyze(exp, scope), scope)
     elif x[0] == 'lambda':         # (lambda (var...) body)
         (_, parms, body) = x
-        return Procedure(parms, body, env)
+        frame_vars = list(parms) + [v for v in internal_defines(body) if v not in parms]
+        fbody = analyze(body, (frame_vars,) + scope, tail=True)
+        nparms, nlocals = len(parms), len(frame_vars) - len(parms)
+        return lambda env: CompiledProcedure(nparms, nlocals, fbody, env)
+    elif x[0] == 'begin':          # (begin exp+)
+        fexps = [analyze(exp, scope) for exp in x[1:-1]]
+        flast = analyze(x[-1], scope, tail)
+        def sequence(env):
+            for f in fexps:
+                f(env)
+            return flast(env)
+        return sequence
     else:                          # (proc arg...)
-        proc = eval(x[0], env)
-        args = [eval(exp, env) for exp in x[1:]]
-        return proc(*args)
\ No newline at end of file
+        if tail:
+            return analyze_tail_application(x, scope)
+        return analyze_application(x, scope)
+
+def lexical_address(var, scope):
+    "Return (depth, index) of var in scope, or None if it is a global."
+    for depth, frame_vars in enumerate(scope):
+        if var in frame_vars:
+            return depth, frame_vars.index(var)
+    return None
+
+def internal_defines(body):
+    "List the variables that (define var exp) forms in a lambda body bind locally."
+    if not isinstance(body, List) or not body or body[0] in ('quote', 'lambda'):
+        return []
+    if body[0] in ('define', 'define-memo'):
+        return [body[1]] + internal_defines(body[2])
+    found = []
+    for exp in body:
+        for var in internal_defines(exp):
+            if var not in found:
+                found.append(var)
+    return found
+
+def analyze_variable(var, scope):
+    "Compile a variable reference to a direct slot access, or a global Env lookup."
+    address = lexical_address(var, scope)
+    if address is None:
+        if not scope:
+            return lambda env: env.find(var)[var]
+        return lambda env: env.globals.find(var)[var]
+    depth, i = address
+    if depth == 0:
+        return lambda env: env.slots[i]
+    elif depth == 1:
+        return lambda env: env.outer.slots[i]
+    def lookup(env):
+        for _ in range(depth):
+            env = env.outer
+        return env.slots[i]
+    return lookup
+
+def analyze_assignment(var, fexp, scope, define=False):
+    "Compile (define var exp) or (set! var exp) against the lexical address of var."
+    address = lexical_address(var, scope)
+    if address is None:
+        if not scope:
+            if define:
+                def assign(env):
+                    env[var] = fexp(env)
+            else:
+                def assign(env):
+                    env.find(var)[var] = fexp(env)
+        else:
+            if define:
+                def assign(env):
+                    env.globals[var] = fexp(env)
+            else:
+                def assign(env):
+                    env.globals.find(var)[var] = fexp(env)
+        return assign
+    depth, i = address
+    def assign(env):
+        val = fexp(env)
+        for _ in range(depth):
+            env = env.outer
+        env.slots[i] = val
+    return assign
+
+def analyze_application(x, scope):
+    "Compile (proc arg...), with unrolled cases for the common small arities."
+    fproc = analyze(x[0], scope)
+    fargs = [analyze(exp, scope) for exp in x[1:]]
+    if len(fargs) == 0:
+        return lambda env: fproc(env)()
+    elif len(fargs) == 1:
+        (a,) = fargs
+        return lambda env: fproc(env)(a(env))
+    elif len(fargs) == 2:
+        (a, b) = fargs
+        return lambda env: fproc(env)(a(env), b(env))
+    elif len(fargs) == 3:
+        (a, b, c) = fargs
+        return lambda env: fproc(env)(a(env), b(env), c(env))
+    else:
+        return lambda env: fproc(env)(*[f(env) for f in fargs])
+
+def analyze_tail_application(x, scope):
+    "Compile (proc arg...) in tail position: defer compiled procedures to the caller's loop."
+    fproc = analyze(x[0], scope)
+    fargs = [analyze(exp, scope) for exp in x[1:]]
+    def tail_call(env):
+        proc = fproc(env)
+        args = [f(env) for f in fargs]
+        if type(proc) is CompiledProcedure:
+            return TailCall(proc, args)
+        return proc(*args)
+    return tail_call
+
+class TailCall(object):
+    "A pending call, returned from a procedure body instead of growing the Python stack."
+    __slots__ = ('proc', 'args')
+    def __init__(self, proc, args):
+        self.proc, self.args = proc, args
+
+class Frame(object):
+    "A procedure activation: a fixed-size list of slots, the enclosing Frame, and the global Env."
+    __slots__ = ('slots', 'outer', 'globals')
+    def __init__(self, slots, outer, globals):
+        self.slots, self.outer, self.globals = slots, outer, globals
+
+class CompiledProcedure(object):
+    "A user-defined Scheme procedure whose body has already been analyzed."
+    __slots__ = ('nparms', 'nlocals', 'body', 'env', 'globals')
+    def __init__(self, nparms, nlocals, body, env):
+        self.nparms, self.nlocals, self.body, self.env = nparms, nlocals, body, env
+        self.globals = env.globals if isinstance(env, Frame) else env
+    def __call__(self, *args):
+        proc = self
+        while True:
+            if len(args) != proc.nparms:
+                raise TypeError('expected %d arguments, got %d' % (proc.nparms, len(args)))
+            slots = list(args) + [None] * proc.nlocals if proc.nlocals else list(args)
+            val = proc.body(Frame(slots, proc.env, proc.globals))
+            if type(val) is not TailCall:
+                return val
+            proc, args = val.proc, val.args
@@ -0,0 +1,130 @@
+################ Benchmarks for lis.py evaluators
+
+## Run with: python lis_bench.py
+
+from __future__ import print_function
+import time
+import lis
+
+FIB = '''(define fib (lambda (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))))'''
+FOLD = '''(define fold (lambda (f acc lst) (if (null? lst) acc (fold f (f acc (car lst)) (cdr lst)))))'''
+RANGE = '''(define range (lambda (a b) (if (= a b) (quote ()) (cons a (range (+ a 1) b)))))'''
+COUNT = '''(define count (lambda (n acc) (if (= n 0) acc (count (- n 1) (+ acc 1)))))'''
+NEST = '''(define nest (lambda (a) (lambda (b) (lambda (c) (lambda (n) (if (= n 0) (+ a (+ b c)) ((((nest a) b) c) (- n 1))))))))'''
+
+WORKLOADS = [
+    ('fib 20',       [FIB],                 '(fib 20)'),
+    ('fold 100 x200', [FOLD, RANGE],        '(fold + 0 (range 0 100))', 200),
+    ('count 1e5',    [COUNT],               '(count 100000 0)'),
+    ('nested x200',  [NEST],                '((((nest 1) 2) 3) 100)', 200),
+]
+
+def timed(thunk, repeat=1):
+    "Return (result, seconds) for the best of 'repeat' runs of thunk."
+    best = None
+    for _ in range(repeat):
+        t0 = time.time()
+        val = thunk()
+        dt = time.time() - t0
+        best = dt if best is None else min(best, dt)
+    return val, best
+
+def run_workload(evaluator, defs, expr, times=1, repeat=3):
+    "Evaluate the definitions in a fresh environment, then time 'expr' run 'times' times."
+    env = lis.standard_env()
+    for d in defs:
+        evaluator(lis.parse(d), env)
+    x = lis.parse(expr)
+    def thunk():
+        for _ in range(times):
+            val = evaluator(x, env)
+        return val
+    return timed(thunk, repeat)
+
+def generated_config(n):
+    "A generated Scheme program of 'n' top-level definitions (~5 MB for n = 100000)."
+    return '\n'.join('(define rule-%d (lambda (x) (if (< x %d) (list x (quote (a b c))) (* x %d.5))))' % (i, i, i)
+                     for i in range(n))
+
+def bench_parse(n=100000):
+    "Time the streaming reader over a large generated program."
+    try:
+        from StringIO import StringIO
+    except ImportError:
+        from io import StringIO
+    src = generated_config(n)
+    forms, dt = timed(lambda: sum(1 for _ in lis.parse_stream(StringIO(src))))
+    print('{0:<14} {1:<10} {2:8.4f} s  {3:5.1f} MB/s  -> {4} forms'.format(
+        'parse %.1f MB' % (len(src) / 1e6), 'stream', dt, len(src) / 1e6 / dt, forms))
+
+def bench_vectors(n=20000):
+    "Sum of squares over n numbers: a scalar list fold against NumPy-backed vectors."
+    if lis.np is None:
+        print('vectors: NumPy not installed, skipped')
+        return
+    env = lis.standard_env()
+    lis.compile_eval(lis.parse(FOLD), env)
+    env['xs'] = [float(i) for i in range(n)]
+    env['v'] = lis.np.arange(n, dtype=float)
+    # Two-argument log takes a base, never NumPy's out: b must come back untouched
+    env['b'] = lis.np.array([2.0, 3.0, 10.0])
+    logs = lis.compile_eval(lis.parse('(vector-map log (vector 8 9 100) b)'), env)
+    assert lis.np.allclose(logs, [3.0, 2.0, 2.0]) and list(env['b']) == [2.0, 3.0, 10.0], logs
+    scalar = lis.parse('(fold (lambda (acc x) (+ acc (* x x))) 0 xs)')
+    vector = lis.parse('(vector-sum (* v v))')
+    mapped = lis.parse('(vector-sum (vector-map (lambda (x) (* x x)) v))')
+    broadcast = lis.parse('(vector-sum (vector-map-broadcast (lambda (x) (* x x)) v))')
+    base = None
+    for name, x in [('scalar fold', scalar), ('vector', vector), ('vector-map', mapped),
+                    ('broadcast', broadcast)]:
+        val, dt = timed(lambda: lis.compile_eval(x, env), repeat=3)
+        base = base or dt
+        print('{0:<14} {1:<10} {2:8.4f} s  x{3:8.1f}  -> {4}'.format('sumsq %d' % n, name, dt, base / dt, val))
+
+def bench_cache(n=100000):
+    "Cold (parse and store) against warm (cache hit) loads of a large generated file."
+    import os, shutil, tempfile
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmp_dir, 'rules.scm')
+        with open(filename, 'w') as f:
+            f.write(generated_config(n))
+        for name in ('cold', 'warm'):
+            forms, dt = timed(lambda: lis.parse_file_cached(filename))
+            print('{0:<14} {1:<10} {2:8.4f} s  -> {3} forms'.format('cache', name, dt, len(forms)))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+MEMO_FIB = '''(define-memo fib (lambda (n) (if (< n 2) n (+ (fib (- n 1)) (fib (- n 2))))))'''
+
+def bench_memo():
+    "Naive recursive fib grows exponentially with n; the define-memo version grows linearly."
+    for n in (15, 20, 25):
+        for name, defn in [('naive', FIB), ('define-memo', MEMO_FIB)]:
+            env = lis.standard_env() # fresh cache for each run
+            lis.compile_eval(lis.parse(defn), env)
+            val, dt = timed(lambda: lis.compile_eval(lis.parse('(fib %d)' % n), env))
+            stats = lis.compile_eval(lis.parse('(memo-stats fib)'), env) if name != 'naive' else ''
+            print('{0:<14} {1:<11} {2:8.4f} s  -> {3} {4}'.format('fib %d' % n, name, dt, val, lis.lispstr(stats)))
+
+def main():
+    evaluators = [('tree eval', lis.eval), ('closure', lis.compile_eval)]
+    for spec in WORKLOADS:
+        name, defs, expr = spec[:3]
+        times = spec[3] if len(spec) > 3 else 1
+        base = None
+        for ename, evaluator in evaluators:
+            val, dt = run_workload(evaluator, defs, expr, times)
+            base = base or dt
+            print('{0:<14} {1:<10} {2:8.4f} s  x{3:5.2f}  -> {4}'.format(name, ename, dt, base / dt, lis.lispstr(val)))
+    # A million-iteration tail-recursive loop runs in constant Python stack depth
+    for ename, evaluator in evaluators:
+        val, dt = run_workload(evaluator, [COUNT], '(count 1000000 0)', repeat=1)
+        print('{0:<14} {1:<10} {2:8.4f} s  {3:6.3f} us/iter  -> {4}'.format('count 1e6', ename, dt, dt * 1e6 / 1000000, val))
+
+if __name__ == '__main__':
+    main()
+    bench_parse()
+    bench_vectors()
+    bench_memo()
+    bench_cache()
@@ -17,6 +17,7 @@ SOURCEDIR = os.path.dirname( os.path.abspath( __file__ ) ) # URL, dir containing
 
 # ~~~ Imports ~~~
 # ~~ Standard ~~
+import time
 from math import pi , sqrt
 from random import random , choice , randrange
 from copy import deepcopy
@@ -151,6 +152,83 @@ class Population(object):
         self.repopulate() # Breed new creatures to replace those that died
         return totalScore / len( self.creatures )
 
+class ArrayPopulation(object):
+    """ The same GA as 'Population' , with the whole population stored as one uint8 matrix ( pop , numGenes * codonLen )
+    Each entry is a codon index into 'POSSIBLE_CODONS' , every stage of a generation is an operation over all creatures at once """
+    
+    def __init__( self , popSize , numGenes = Creature.numGenes , codonLen = Gene.codonLen , mutateProb = Creature.mutateProb , 
+                  keepFraction = 0.6 , rng = None ):
+        """ Initialize 'popSize' creatures with completely random genomes """
+        assert popSize % 2 == 0 , "Initial population must have an even number of individuals!"
+        self.popSize      = popSize
+        self.numGenes     = numGenes
+        self.codonLen     = codonLen
+        self.mutateProb   = mutateProb
+        self.keepFraction = keepFraction
+        self.target       = POSSIBLE_CODONS.index( "NT" ) # Codon that scores a point
+        self.rng          = np.random.RandomState( rng )
+        self.genomes      = self.rng.randint( len( POSSIBLE_CODONS ) , size = ( popSize , numGenes * codonLen ) ).astype( np.uint8 )
+        self.scores       = np.zeros( popSize , dtype = np.int64 )
+        self.keepNum      = int( popSize * keepFraction )
+        if self.keepNum % 2 != 0: self.keepNum -= 1 # Keep the number of individuals even for simplicity
+        self.codonCols    = np.arange( codonLen ) # Column offsets of the codons within a gene
+        self.geneIdx      = np.arange( numGenes )
+        
+    @classmethod
+    def from_creatures( clss , creatures , **kwargs ):
+        """ Build from a list of 'Creature's """
+        pop = clss( len( creatures ) , len( creatures[0].genes ) , len( creatures[0].genes[0].codons ) , **kwargs )
+        index = { codon : i for i , codon in enumerate( POSSIBLE_CODONS ) }
+        pop.genomes[:] = [ [ index[ codon ] for gene in crtr.genes for codon in gene.codons ] for crtr in creatures ]
+        return pop
+    
+    def to_creatures( self ):
+        """ Return the population as a list of 'Creature's """
+        return [ Creature( [ Gene( [ POSSIBLE_CODONS[ c ] for c in row[ i : i + self.codonLen ] ] ) 
+                             for i in xrange( 0 , len( row ) , self.codonLen ) ] ) 
+                 for row in self.genomes ]
+        
+    def evaluate_all( self ):
+        """ Fitness of every creature: the number of "NT" codons in its genome """
+        np.sum( self.genomes == self.target , axis = 1 , out = self.scores )
+        
+    def select( self ):
+        """ Move the top 'keepNum' creatures to the front rows , the rest will be overwritten by offspring """
+        keep = np.argpartition( -self.scores , self.keepNum - 1 )[ : self.keepNum ] if self.keepNum < self.popSize else slice( None )
+        self.genomes[ : self.keepNum ] = self.genomes[ keep ]
+        self.scores[ : self.keepNum ]  = self.scores[ keep ]
+        
+    def repopulate( self ):
+        """ Breed random pairs of distinct survivors , two offspring per pair , with two-point crossover at gene boundaries """
+        K , nPairs , rng = self.keepNum , ( self.popSize - self.keepNum ) // 2 , self.rng
+        # Choose partners , the second is offset from the first so the two are never the same creature
+        mom = rng.randint( K , size = nPairs )
+        dad = ( mom + rng.randint( 1 , K , size = nPairs ) ) % K
+        # Crossover cuts as in 'Creature.breed': cut1 in [ 0 , numGenes - 1 ) , cut2 in ( cut1 , numGenes )
+        cut1 = rng.randint( self.numGenes - 1 , size = nPairs )
+        cut2 = cut1 + 1 + ( rng.rand( nPairs ) * ( self.numGenes - 1 - cut1 ) ).astype( int )
+        swap = np.repeat( ( self.geneIdx >= cut1[ : , None ] ) & ( self.geneIdx < cut2[ : , None ] ) , self.codonLen , axis = 1 )
+        A , B = self.genomes[ mom ] , self.genomes[ dad ]
+        children = self.genomes[ K : K + 2 * nPairs ]
+        children[ : nPairs ] = np.where( swap , B , A )
+        children[ nPairs : ] = np.where( swap , A , B )
+        self.mutate( children )
+        
+    def mutate( self , children ):
+        """ With probability 'mutateProb' each child has one random gene replaced by random codons """
+        rows  = np.flatnonzero( self.rng.rand( len( children ) ) <= self.mutateProb )
+        genes = self.rng.randint( self.numGenes , size = len( rows ) )
+        cols  = genes[ : , None ] * self.codonLen + self.codonCols
+        children[ rows[ : , None ] , cols ] = self.rng.randint( len( POSSIBLE_CODONS ) , size = cols.shape )
+        
+    def generation( self ):
+        """ Simulate one generation , return the average fitness before selection """
+        self.evaluate_all()
+        avg = self.scores.mean()
+        self.select()
+        self.repopulate()
+        return avg
+
 # == Main Application ======================================================================================================================
 if __name__ == "__main__":
     # Print a Gene
@@ -173,6 +251,18 @@ if __name__ == "__main__":
     print
     print "Simulated" , N , "generations with" , P , "individuals"
     print "Minimum Average:" , minAvg , ", Maximum Average:" , maxAvg
+    
+    # Run the array engine at scale
+    N = 1000
+    P = 100000
+    bigPond = ArrayPopulation( P , rng = 0 )
+    t0 = time.time()
+    avgs = [ bigPond.generation() for gen in xrange( N ) ]
+    dt = time.time() - t0
+    print
+    print "ArrayPopulation: Simulated" , N , "generations with" , P , "individuals in %.2f s ( %.2f ms / generation )" % ( dt , 1000 * dt / N )
+    print "Average fitness at generations 0 , 10 , 100 ," , N - 1 , ":" , [ avgs[i] for i in [ 0 , 10 , 100 , N - 1 ] ] , \
+          "of" , bigPond.numGenes * bigPond.codonLen
 
 # == End Main ==============================================================================================================================
 